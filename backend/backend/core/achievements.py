@@ -0,0 +1,52 @@
+import threading
+
+from django.contrib.auth.models import User
+
+from .models import Achievement, UserAchievement
+
+# key -> id; definitions change rarely, so every unlock reuses one map
+_achievement_ids = None
+_lock = threading.Lock()
+
+
+def achievement_ids():
+    global _achievement_ids
+    with _lock:
+        if _achievement_ids is None:
+            _achievement_ids = dict(Achievement.objects.values_list('key', 'id'))
+        return _achievement_ids
+
+
+def reset_achievement_ids():
+    global _achievement_ids
+    with _lock:
+        _achievement_ids = None
+
+
+def definitions():
+    return list(Achievement.objects.order_by('id').values('key', 'name', 'description'))
+
+
+def unlock_achievement(username, key):
+    """
+    Record that ``username`` unlocked ``key``: a single-row insert that
+    does nothing if the unlock already exists, so retries and concurrent
+    requests are safe. Returns "unlocked", "unknown_achievement" or "unknown_user".
+    """
+    achievement_id = achievement_ids().get(key)
+    if achievement_id is None:
+        return "unknown_achievement"
+    user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+    if user_id is None:
+        return "unknown_user"
+    UserAchievement.objects.bulk_create(
+        [UserAchievement(user_id=user_id, achievement_id=achievement_id)], ignore_conflicts=True
+    )
+    return "unlocked"
+
+
+def unlocked_keys(username):
+    return list(
+        UserAchievement.objects.filter(user__username=username)
+        .order_by('unlocked_at').values_list('achievement__key', flat=True)
+    )
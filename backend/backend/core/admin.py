@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AuthToken, Message, PlayerStats
+from .models import Achievement, AuthToken, Message, PlayerStats, UserAchievement
 
 @admin.register(AuthToken)
 class AuthTokenAdmin(admin.ModelAdmin):
@@ -19,3 +19,14 @@ class PlayerStatsAdmin(admin.ModelAdmin):
     list_display    = ("user", "holes_played", "shots_taken", "handicap")
     readonly_fields = ("handicap",)
     search_fields   = ("user__username",)
+
+@admin.register(Achievement)
+class AchievementAdmin(admin.ModelAdmin):
+    list_display    = ("key", "name", "description")
+    search_fields   = ("key", "name")
+
+@admin.register(UserAchievement)
+class UserAchievementAdmin(admin.ModelAdmin):
+    list_display    = ("user", "achievement", "unlocked_at")
+    search_fields   = ("user__username",)
+    list_filter     = ("achievement",)
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+# What an auth_token cookie resolves to
+TokenUser = namedtuple("TokenUser", ["user_id", "username"])
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of token hash -> TokenUser with a per-entry TTL.
+
+    Shared by the HTTP views and every websocket consumer in a worker
+    process. Logins and logouts invalidate entries in the process that
+    handled them; other workers see the change once the TTL runs out.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token_hash):
+        with self.lock:
+            entry = self.entries.get(token_hash)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self.entries[token_hash]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(token_hash)
+            self.hits += 1
+            return user
+
+    def set(self, token_hash, user):
+        with self.lock:
+            self.entries[token_hash] = (user, time.monotonic() + self.ttl)
+            self.entries.move_to_end(token_hash)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token_hash):
+        with self.lock:
+            self.entries.pop(token_hash, None)
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            stale = [key for key, (user, _) in self.entries.items() if user.user_id == user_id]
+            for key in stale:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_config = getattr(settings, "AUTH_TOKEN_CACHE", {})
+token_cache = TokenCache(
+    max_size=_config.get("MAX_SIZE", 10000),
+    ttl=_config.get("TTL", 60),
+)
+
+
+def load_user(token_hash):
+    """Look a token hash up in the DB and cache the result."""
+    from .models import AuthToken
+    row = (
+        AuthToken.objects
+        .filter(token_hash=token_hash)
+        .values_list("user_id", "user__username")
+        .first()
+    )
+    if row is None:
+        return None
+    user = TokenUser(*row)
+    token_cache.set(token_hash, user)
+    return user
+
+
+def resolve_token(raw_token):
+    """Return the TokenUser for an auth_token cookie, or None if it's not valid."""
+    if not raw_token:
+        return None
+    token_hash = hash_token(raw_token)
+    user = token_cache.get(token_hash)
+    if user is None:
+        user = load_user(token_hash)
+    return user
+
+
+async def aresolve_token(raw_token):
+    """Async resolve_token; cache hits don't leave the event loop."""
+    if not raw_token:
+        return None
+    token_hash = hash_token(raw_token)
+    user = token_cache.get(token_hash)
+    if user is None:
+        user = await database_sync_to_async(load_user)(token_hash)
+    return user
+
+
+def invalidate_token(raw_token):
+    token_cache.invalidate(hash_token(raw_token))
+
+
+def invalidate_user(user_id):
+    token_cache.invalidate_user(user_id)
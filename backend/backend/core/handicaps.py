@@ -0,0 +1,98 @@
+import threading
+
+
+def bucket_key(handicap):
+    # Handicaps are stored to one decimal place
+    return int(round(handicap * 10))
+
+
+class HandicapHistogram:
+    """
+    Number of players at each handicap, for percentile ranks.
+
+    Seeded once per process with one query, then kept current by
+    ``set`` on every handicap change, so a percentile costs a pass over
+    the few hundred distinct handicaps instead of a count over every
+    player. Each player's bucket is remembered, which makes ``set``
+    idempotent: changes committed while the seed query runs are queued
+    and replayed afterwards, whether or not the query already saw them.
+    Players with no holes played have no real handicap and aren't counted.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.players = {}
+        self.total = 0
+        self.loaded = False
+        self.loading = False
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+
+    def seed(self, rows):
+        with self.lock:
+            self.counts = {}
+            self.players = {}
+            for user_id, handicap in rows:
+                self._set(user_id, handicap)
+            # Changes that landed while the rows were being read win
+            for user_id, handicap in self.pending.items():
+                self._set(user_id, handicap)
+            self.pending = {}
+            self.total = len(self.players)
+            self.loaded = True
+            self.loading = False
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.load_lock:
+            if self.loaded:
+                return
+            from .models import PlayerStats
+            with self.lock:
+                self.loading = True
+                self.pending = {}
+            try:
+                rows = list(PlayerStats.objects.filter(holes_played__gt=0).values_list('user_id', 'handicap'))
+            except Exception:
+                with self.lock:
+                    self.loading = False
+                    self.pending = {}
+                raise
+            self.seed(rows)
+
+    def _set(self, user_id, handicap):
+        old = self.players.pop(user_id, None)
+        if old is not None:
+            self.counts[old] -= 1
+            if not self.counts[old]:
+                del self.counts[old]
+        if handicap is not None:
+            key = bucket_key(handicap)
+            self.players[user_id] = key
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def set(self, user_id, handicap):
+        """A player's handicap is now ``handicap``; None means not counted."""
+        with self.lock:
+            if self.loading:
+                self.pending[user_id] = handicap
+                return
+            if not self.loaded:
+                # The seed query will read it from the table
+                return
+            self._set(user_id, handicap)
+            self.total = len(self.players)
+
+    def percentile(self, handicap):
+        """Percent of counted players with a worse (higher) handicap."""
+        with self.lock:
+            if not self.total:
+                return None
+            key = bucket_key(handicap)
+            worse = sum(players for bucket, players in self.counts.items() if bucket > key)
+            return round(100.0 * worse / self.total, 1)
+
+
+handicap_histogram = HandicapHistogram()
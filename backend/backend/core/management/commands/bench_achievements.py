@@ -0,0 +1,96 @@
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from backend.core.achievements import achievement_ids, unlock_achievement
+from backend.core.models import UserAchievement
+
+
+def unlock_in_file(path, username, key):
+    # What AchievementsView.post used to do: read, modify, rewrite the whole file
+    with open(path) as f:
+        data = json.load(f)
+    unlocked = data["users"].setdefault(username, [])
+    if key not in unlocked:
+        unlocked.append(key)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+class Command(BaseCommand):
+    help = "Achievement unlock throughput with concurrent writers: database rows vs the old JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8, help="Concurrent threads")
+        parser.add_argument("--players", type=int, default=200)
+        parser.add_argument("--repeats", type=int, default=2, help="Times each unlock is sent, to exercise idempotency")
+
+    def handle(self, *args, **options):
+        writers, players, repeats = options["writers"], options["players"], options["repeats"]
+        keys = sorted(achievement_ids())
+        if not keys:
+            self.stderr.write("No achievements defined; run migrate first")
+            return
+
+        # Throwaway players so the unlocks go through the real tables
+        prefix = f"bench_ach_{secrets.token_hex(3)}_"
+        User.objects.bulk_create([User(username=f"{prefix}{i}") for i in range(players)])
+        usernames = [f"{prefix}{i}" for i in range(players)]
+        expected = {(username, key) for username in usernames for key in keys}
+        work = [pair for pair in expected for _ in range(repeats)]
+
+        try:
+            elapsed, errors = self.run_writers(writers, work, unlock_achievement, close_db=True)
+            stored = UserAchievement.objects.filter(user__username__startswith=prefix).count()
+            self.report("database", len(work), elapsed, errors, stored, len(expected))
+
+            with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+                json.dump({"achievements": [{"key": key} for key in keys], "users": {}}, f)
+            try:
+                elapsed, errors = self.run_writers(writers, work, lambda u, k: unlock_in_file(f.name, u, k))
+                try:
+                    with open(f.name) as saved:
+                        stored = sum(len(v) for v in json.load(saved)["users"].values())
+                except ValueError:
+                    stored = 0  # the file itself was corrupted
+                self.report("json file", len(work), elapsed, errors, stored, len(expected))
+            finally:
+                os.unlink(f.name)
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+
+    def run_writers(self, writers, work, unlock, close_db=False):
+        errors = []
+        chunks = [work[i::writers] for i in range(writers)]
+
+        def writer(chunk):
+            try:
+                for username, key in chunk:
+                    try:
+                        unlock(username, key)
+                    except Exception as e:
+                        errors.append(e)
+            finally:
+                if close_db:
+                    connection.close()
+
+        threads = [threading.Thread(target=writer, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started, len(errors)
+
+    def report(self, label, requests, elapsed, errors, stored, expected):
+        self.stdout.write(
+            f"{label:<10} {requests} unlocks in {elapsed:.2f}s ({requests / elapsed:.0f}/s), "
+            f"{errors} errors, {stored}/{expected} unlocks stored"
+        )
@@ -0,0 +1,79 @@
+import asyncio
+import secrets
+import statistics
+import time
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from backend.core.auth import hash_token, token_cache
+from backend.core.models import AuthToken
+
+# Keep the run in this process: no Redis needed
+BENCH_SETTINGS = {
+    "CHANNEL_LAYERS": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    "GAME_PRESENCE": {"BACKEND": "backend.game.presence.InMemoryPresenceRegistry"},
+}
+
+
+class Command(BaseCommand):
+    help = "Game websocket connect latency with and without the auth token cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connects", type=int, default=200, help="Connects per measurement")
+
+    def handle(self, *args, **options):
+        connects = options["connects"]
+
+        # Throwaway user so the lookup goes through the real DB
+        user = User.objects.create_user(username=f"bench_auth_{secrets.token_hex(4)}")
+        raw_token = secrets.token_urlsafe(32)
+        AuthToken.objects.create(user=user, token_hash=hash_token(raw_token))
+        try:
+            with override_settings(**BENCH_SETTINGS):
+                results = asyncio.run(self.run_all(raw_token, connects))
+        finally:
+            user.delete()
+            token_cache.clear()
+
+        self.stdout.write(f"{connects} connects per measurement, ms from connect to connection_success")
+        self.stdout.write(f"{'cache':<10}{'mean':>8}{'p50':>8}{'p95':>8}{'hits':>7}{'misses':>8}")
+        for label, samples, stats in results:
+            samples = sorted(samples)
+            p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+            self.stdout.write(
+                f"{label:<10}{statistics.mean(samples) * 1e3:>8.2f}"
+                f"{statistics.median(samples) * 1e3:>8.2f}{p95 * 1e3:>8.2f}"
+                f"{stats['hits']:>7}{stats['misses']:>8}"
+            )
+
+    async def run_all(self, raw_token, connects):
+        from backend.asgi import application
+
+        results = []
+        for label, cold in (('off', True), ('on', False)):
+            before = token_cache.stats()
+            samples = await self.measure(application, raw_token, connects, cold)
+            after = token_cache.stats()
+            stats = {key: after[key] - before[key] for key in ('hits', 'misses')}
+            results.append((label, samples, stats))
+        return results
+
+    async def measure(self, application, raw_token, connects, cold):
+        samples = []
+        headers = [(b"cookie", f"auth_token={raw_token}".encode())]
+        for _ in range(connects):
+            if cold:
+                # Every connect has to go to the DB
+                token_cache.clear()
+            communicator = WebsocketCommunicator(application, "/ws/game/hole/1/", headers=headers)
+            started = time.perf_counter()
+            connected, _ = await communicator.connect()
+            if not connected:
+                raise RuntimeError("Game websocket refused the benchmark user")
+            await communicator.receive_from()
+            samples.append(time.perf_counter() - started)
+            await communicator.disconnect()
+        return samples
@@ -0,0 +1,59 @@
+import json
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.core.achievements import reset_achievement_ids
+from backend.core.models import Achievement, UserAchievement
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    'achievements', 'achievements.json'
+)
+
+
+class Command(BaseCommand):
+    help = "Import achievement definitions and unlocks from the old achievements.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=DEFAULT_PATH, help="achievements.json to read")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"]) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Can't read {options['path']}: {e}")
+
+        definitions = data.get("achievements", [])
+        users = data.get("users", {})
+
+        # Safe to run again: definitions are upserted, existing unlocks skipped
+        with transaction.atomic():
+            Achievement.objects.bulk_create(
+                [Achievement(key=a["key"], name=a.get("name", a["key"]), description=a.get("description", ""))
+                 for a in definitions],
+                update_conflicts=True, unique_fields=["key"], update_fields=["name", "description"]
+            )
+            achievement_ids = dict(Achievement.objects.values_list("key", "id"))
+            user_ids = dict(User.objects.filter(username__in=users.keys()).values_list("username", "id"))
+
+            unlocks = [
+                UserAchievement(user_id=user_ids[username], achievement_id=achievement_ids[key])
+                for username, keys in users.items() if username in user_ids
+                for key in set(keys) if key in achievement_ids
+            ]
+            before = UserAchievement.objects.count()
+            UserAchievement.objects.bulk_create(unlocks, ignore_conflicts=True, batch_size=1000)
+            added = UserAchievement.objects.count() - before
+        reset_achievement_ids()
+
+        missing = sorted(set(users) - set(user_ids))
+        self.stdout.write(
+            f"{len(definitions)} achievements, {added} new unlocks "
+            f"({len(unlocks) - added} already present)"
+        )
+        if missing:
+            self.stdout.write(f"Skipped {len(missing)} unknown users: {', '.join(missing)}")
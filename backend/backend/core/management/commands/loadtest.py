@@ -0,0 +1,258 @@
+import asyncio
+import math
+import secrets
+import statistics
+import time
+
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from backend.core.auth import hash_token
+from backend.core.models import AuthToken
+
+# Everything runs in this process: no Redis needed
+LOADTEST_SETTINGS = {
+    "CHANNEL_LAYERS": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    "GAME_PRESENCE": {"BACKEND": "backend.game.presence.InMemoryPresenceRegistry"},
+    "LOBBY_PRESENCE": {"BACKEND": "backend.lobby.presence.InMemoryLobbyPresence"},
+    # Rooms as configured, but nobody gets matched away mid-run
+    "LOBBY_MATCHMAKING": {
+        **getattr(settings, "LOBBY_MATCHMAKING", {}),
+        "SESSION_SIZE": 10 ** 6,
+        "MIN_PLAYERS": 10 ** 6,
+    },
+}
+
+
+def percentile(samples, q):
+    # Nearest-rank percentile of an already sorted list
+    return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+
+class Client:
+    """One simulated player: a communicator plus what it learned on connect."""
+
+    def __init__(self, communicator, username):
+        self.communicator = communicator
+        self.username = username
+        self.alive = True
+        self.ready = False
+
+    async def wait_for(self, matches, timeout):
+        # Skip other players' traffic until our own message comes back
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            message = await self.communicator.receive_json_from(timeout=remaining)
+            if matches(message):
+                return message
+
+
+class Workload:
+    """A scripted request/response loop run by every client."""
+
+    path = None
+
+    async def on_connect(self, client, timeout):
+        pass
+
+    def step(self, client, n):
+        """Return (message to send, predicate for the reply that completes it)."""
+        raise NotImplementedError
+
+
+class MoveWorkload(Workload):
+    path = "/ws/game/hole/1/"
+
+    async def on_connect(self, client, timeout):
+        await client.wait_for(lambda m: m.get('type') == 'connection_success', timeout)
+
+    def step(self, client, n):
+        # Alternate so every move is a real change at any quantum
+        x, y = 120.0 + 10 * (n % 2), 300.0
+        return {'type': 'move', 'x': x, 'y': y}, lambda m: (
+            m.get('type') in ('positions_snapshot', 'positions_summary')
+            and any(p['username'] == client.username and p['x'] == x for p in m['positions'])
+        )
+
+
+class PuttWorkload(MoveWorkload):
+
+    def step(self, client, n):
+        return {'type': 'putt', 'angle': 0.3, 'power': 200.0, 'x': 120.0, 'y': 300.0}, lambda m: (
+            m.get('type') == 'player_putt' and m.get('username') == client.username
+        )
+
+
+class ChatWorkload(MoveWorkload):
+
+    def step(self, client, n):
+        text = f"{client.username}:{n}"
+        return {'type': 'chat', 'message': text}, lambda m: (
+            m.get('type') == 'chat' and m.get('message') == text
+        )
+
+
+class ReadyWorkload(Workload):
+    path = "/ws/lobby/"
+
+    async def on_connect(self, client, timeout):
+        await client.wait_for(lambda m: m.get('type') == 'username', timeout)
+
+    def step(self, client, n):
+        client.ready = not client.ready
+        expected = client.ready
+        return {'type': 'toggle_ready'}, lambda m: (
+            m.get('type') == 'lobby_update'
+            and any(
+                c['player']['username'] == client.username and c['player'].get('is_ready') == expected
+                for c in m['changes']
+            )
+        )
+
+
+class PlayersWorkload(ReadyWorkload):
+
+    def step(self, client, n):
+        return {'type': 'request_players'}, lambda m: m.get('type') == 'players_list'
+
+
+class LeaderboardWorkload(Workload):
+    path = "/ws/leaderboard/"
+
+    def step(self, client, n):
+        return {'type': 'request_leaderboard'}, lambda m: m.get('type') == 'leaderboard'
+
+
+WORKLOADS = {
+    'move': MoveWorkload,
+    'putt': PuttWorkload,
+    'chat': ChatWorkload,
+    'ready': ReadyWorkload,
+    'players': PlayersWorkload,
+    'leaderboard': LeaderboardWorkload,
+}
+
+
+class Command(BaseCommand):
+    help = "Drive simulated clients through the websocket consumers and report throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workloads", default=",".join(WORKLOADS), help="Comma-separated: " + ", ".join(WORKLOADS))
+        parser.add_argument("--clients", type=int, default=50, help="Concurrent clients per workload")
+        parser.add_argument("--messages", type=int, default=20, help="Requests each client sends")
+        parser.add_argument("--think", type=float, default=0.0, help="Pause between a client's requests (ms)")
+        parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for each reply")
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options["workloads"].split(",") if name.strip()]
+        unknown = [name for name in names if name not in WORKLOADS]
+        if unknown:
+            raise CommandError(f"Unknown workload(s): {', '.join(unknown)}")
+
+        # Throwaway users so the consumers authenticate through the real DB
+        tag = secrets.token_hex(4)
+        User.objects.bulk_create([
+            User(username=f"loadtest_{tag}_{i}") for i in range(options["clients"])
+        ])
+        users = list(User.objects.filter(username__startswith=f"loadtest_{tag}_").order_by('id'))
+        tokens = {user.username: secrets.token_urlsafe(32) for user in users}
+        AuthToken.objects.bulk_create([
+            AuthToken(user=user, token_hash=hash_token(tokens[user.username])) for user in users
+        ])
+
+        try:
+            with override_settings(**LOADTEST_SETTINGS):
+                results = asyncio.run(self.run_all(names, tokens, options))
+        finally:
+            User.objects.filter(username__startswith=f"loadtest_{tag}_").delete()
+
+        self.stdout.write(
+            f"{options['clients']} clients x {options['messages']} requests, latency in ms"
+        )
+        self.stdout.write(
+            f"{'workload':<13}{'ok':>7}{'errors':>8}{'req/s':>10}{'connect':>9}"
+            f"{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+        )
+        for name, result in results:
+            latencies = sorted(result['latencies'])
+            connects = sorted(result['connects'])
+            if latencies:
+                row = "".join(
+                    f"{percentile(latencies, q) * 1e3:>8.2f}" for q in (0.5, 0.95, 0.99, 1.0)
+                )
+            else:
+                row = f"{'-':>8}" * 4
+            connect = f"{statistics.median(connects) * 1e3:>9.2f}" if connects else f"{'-':>9}"
+            throughput = len(latencies) / result['elapsed'] if result['elapsed'] else 0.0
+            self.stdout.write(
+                f"{name:<13}{len(latencies):>7}{result['errors']:>8}{throughput:>10.0f}{connect}{row}"
+            )
+
+    async def run_all(self, names, tokens, options):
+        from backend.asgi import application
+
+        results = []
+        for name in names:
+            results.append((name, await self.run_workload(application, WORKLOADS[name](), tokens, options)))
+        return results
+
+    async def run_workload(self, application, workload, tokens, options):
+        timeout = options["timeout"]
+        result = {'latencies': [], 'connects': [], 'errors': 0, 'elapsed': 0.0}
+
+        clients = await asyncio.gather(*[
+            self.connect(application, workload, username, token, timeout, result)
+            for username, token in tokens.items()
+        ])
+        clients = [client for client in clients if client is not None]
+
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            self.drive(client, workload, options, result) for client in clients
+        ])
+        result['elapsed'] = time.perf_counter() - started
+
+        for client in clients:
+            if client.alive:
+                await client.communicator.disconnect()
+        return result
+
+    async def connect(self, application, workload, username, token, timeout, result):
+        communicator = WebsocketCommunicator(
+            application, workload.path, headers=[(b"cookie", f"auth_token={token}".encode())]
+        )
+        client = Client(communicator, username)
+        started = time.perf_counter()
+        try:
+            connected, _ = await communicator.connect(timeout=timeout)
+            if not connected:
+                result['errors'] += 1
+                return None
+            await workload.on_connect(client, timeout)
+        except asyncio.TimeoutError:
+            result['errors'] += 1
+            return None
+        result['connects'].append(time.perf_counter() - started)
+        return client
+
+    async def drive(self, client, workload, options, result):
+        for n in range(options["messages"]):
+            message, matches = workload.step(client, n)
+            started = time.perf_counter()
+            await client.communicator.send_json_to(message)
+            try:
+                await client.wait_for(matches, options["timeout"])
+            except asyncio.TimeoutError:
+                # The communicator cancels the app on a timeout; this client is done
+                result['errors'] += options["messages"] - n
+                client.alive = False
+                return
+            result['latencies'].append(time.perf_counter() - started)
+            if options["think"]:
+                await asyncio.sleep(options["think"] / 1e3)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+def fill_handicaps(apps, schema_editor):
+    # Same formula as PlayerStats.compute_handicap at the time of this migration
+    PlayerStats = apps.get_model('core', 'PlayerStats')
+    rows = list(PlayerStats.objects.only('id', 'shots_taken', 'holes_played'))
+    for row in rows:
+        avg = row.shots_taken / row.holes_played if row.holes_played else 0.0
+        row.handicap = round((avg - 4) * (113.0 / 120.0), 1)
+    PlayerStats.objects.bulk_update(rows, ['handicap'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_authtoken_ball_image_authtoken_profile_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerstats',
+            name='handicap',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.RunPython(fill_handicaps, migrations.RunPython.noop),
+    ]
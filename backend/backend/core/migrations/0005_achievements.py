@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The definitions achievements.json shipped with; import_achievements brings over unlocks
+ACHIEVEMENTS = [
+    ("first_putt", "First Putt", "Complete your first hole!"),
+    ("finished_all_holes", "Finish all 6 Holes", "Complete all holes"),
+    ("shot_limit", "Shot Limit Failure!", "Reach the shot limit"),
+]
+
+
+def create_achievements(apps, schema_editor):
+    Achievement = apps.get_model('core', 'Achievement')
+    for key, name, description in ACHIEVEMENTS:
+        Achievement.objects.get_or_create(key=key, defaults={'name': name, 'description': description})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_playerstats_handicap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Achievement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.CharField(blank=True, max_length=255)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserAchievement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unlocked_at', models.DateTimeField(auto_now_add=True)),
+                ('achievement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unlocks', to='core.achievement')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='achievements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'achievement'), name='userachievement_unique_unlock')],
+            },
+        ),
+        migrations.RunPython(create_achievements, migrations.RunPython.noop),
+    ]
@@ -24,6 +24,16 @@ class PlayerStats(models.Model):
 
     holes_played = models.PositiveIntegerField(default=0)
     shots_taken  = models.PositiveIntegerField(default=0)
+    # Stored so scoreboards can read and sort it; kept current on every write
+    handicap     = models.FloatField(default=0.0, db_index=True)
+
+    @staticmethod
+    def compute_handicap(shots_taken, holes_played) -> float:
+        # Simple “handicap” = (avg strokes per hole − par) × scale
+        par_per_hole = 4
+        scale_factor = 113.0 / 120.0
+        avg = shots_taken / holes_played if holes_played else 0.0
+        return round((avg - par_per_hole) * scale_factor, 1)
 
     @property
     def avg_strokes_per_hole(self) -> float:
@@ -31,13 +41,9 @@ class PlayerStats(models.Model):
             return 0.0
         return self.shots_taken / self.holes_played
 
-    @property
-    def handicap(self) -> float:
-        # Simple “handicap” = (avg strokes per hole − par) × scale
-        par_per_hole = 4
-        scale_factor = 113.0 / 120.0
-        diff = self.avg_strokes_per_hole - par_per_hole
-        return round(diff * scale_factor, 1)
+    def save(self, *args, **kwargs):
+        self.handicap = self.compute_handicap(self.shots_taken, self.holes_played)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return (
@@ -45,4 +51,26 @@ class PlayerStats(models.Model):
             f"Holes: {self.holes_played}, "
             f"Shots: {self.shots_taken}, "
             f"Handicap: {self.handicap}"
-        )
\ No newline at end of file
+        )
+
+class Achievement(models.Model):
+    key = models.CharField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    description = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return self.name
+
+class UserAchievement(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='achievements')
+    achievement = models.ForeignKey(Achievement, on_delete=models.CASCADE, related_name='unlocks')
+    unlocked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # One row per unlock; inserting it again is a no-op
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'achievement'], name='userachievement_unique_unlock'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} unlocked {self.achievement.key}"
@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from backend.leaderboard.models import RoundResult
+from backend.leaderboard.publisher import record_best_score
+from backend.leaderboard.rollups import add_to_rollups
+from backend.lobby.models import LobbyStatus
+from .handicaps import handicap_histogram
+from .models import PlayerStats
+
+# Most round results one batch request may carry
+MAX_BATCH = 500
+
+# Largest round we accept; anything bigger is a bad client, not a round
+MAX_ROUND_HOLES = 18
+MAX_ROUND_SHOTS = 50 * MAX_ROUND_HOLES
+
+
+def parse_round(entry):
+    """(username, total_shots, total_holes) from a submitted JSON object; ValueError if malformed"""
+    username = entry.get("username")
+    shots, holes = entry.get("totalShots"), entry.get("totalHoles")
+    if not isinstance(username, str) or not username:
+        raise ValueError("username")
+    if isinstance(shots, bool) or isinstance(holes, bool):
+        raise ValueError("totals")
+    try:
+        shots, holes = int(shots), int(holes)
+    except OverflowError:
+        # int(float('inf'))
+        raise ValueError("totals")
+    if not 1 <= shots <= MAX_ROUND_SHOTS or not 0 <= holes <= MAX_ROUND_HOLES:
+        raise ValueError("totals")
+    return username, shots, holes
+
+
+def add_round_stats(user_id, shots, holes):
+    """
+    Add a round to PlayerStats and refresh the stored handicap.
+    Returns the new handicap, or None while the player has no holes.
+    """
+    rows = PlayerStats.objects.select_for_update().filter(user_id=user_id)
+    current = rows.values_list('shots_taken', 'holes_played').first()
+    if current is None:
+        PlayerStats.objects.get_or_create(user_id=user_id)
+        current = rows.values_list('shots_taken', 'holes_played').first()
+    old_shots, old_holes = current
+
+    # The row is locked, so the handicap matches the totals it is stored with
+    handicap = PlayerStats.compute_handicap(old_shots + shots, old_holes + holes)
+    rows.update(
+        shots_taken=F("shots_taken") + shots,
+        holes_played=F("holes_played") + holes,
+        handicap=handicap
+    )
+    return handicap if old_holes + holes else None
+
+
+def lower_best_score(user_id, shots):
+    # Only writes when it is a new best; 0 means no score yet
+    return LobbyStatus.objects.filter(user_id=user_id).filter(
+        Q(best_score=0) | Q(best_score__gt=shots)
+    ).update(best_score=shots)
+
+
+def submit_rounds(rounds):
+    """
+    Record finished rounds, given as (username, total_shots, total_holes).
+
+    Every round is appended to RoundResult. Rounds are then grouped per
+    player: their totals are added to PlayerStats (refreshing the stored
+    handicap) and the day/week rollups, and their lowest round becomes
+    the best score if it beats the stored one. Returns {username: "updated" | "unchanged" | "not_found"}.
+    """
+    usernames = {username for username, _, _ in rounds}
+    user_ids = dict(
+        LobbyStatus.objects.filter(user__username__in=usernames).values_list('user__username', 'user_id')
+    )
+    results = {username: "not_found" for username in usernames - user_ids.keys()}
+
+    played_at = timezone.now()
+    history = []
+    totals = {}
+    for username, shots, holes in rounds:
+        if username in user_ids:
+            history.append(RoundResult(user_id=user_ids[username], shots=shots, holes=holes, played_at=played_at))
+            total = totals.setdefault(username, [0, 0, shots, 0])
+            total[0] += shots
+            total[1] += holes
+            total[2] = min(total[2], shots)
+            total[3] += 1
+
+    improved = []
+    handicaps = []
+    with transaction.atomic():
+        RoundResult.objects.bulk_create(history)
+        # Same row order in every request, so concurrent batches can't deadlock
+        for username in sorted(totals, key=user_ids.get):
+            shots, holes, best, count = totals[username]
+            handicaps.append((user_ids[username], add_round_stats(user_ids[username], shots, holes)))
+            add_to_rollups(user_ids[username], count, shots, best, played_at)
+            if lower_best_score(user_ids[username], best):
+                improved.append((username, best))
+                results[username] = "updated"
+            else:
+                results[username] = "unchanged"
+        # Conditional UPDATEs skip the post_save signal, so tell the leaderboard directly
+        transaction.on_commit(lambda: [record_best_score(username, best) for username, best in improved])
+        transaction.on_commit(lambda: [handicap_histogram.set(user_id, handicap) for user_id, handicap in handicaps])
+    return results
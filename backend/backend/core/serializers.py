@@ -1,11 +1,19 @@
 # backend/core/serializers.py
 from rest_framework import serializers
+from .handicaps import handicap_histogram
 from .models import PlayerStats
 
 class PlayerStatsSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
     handicap = serializers.FloatField(read_only=True)
+    percentile = serializers.SerializerMethodField()
 
     class Meta:
         model = PlayerStats
-        fields = ("username", "holes_played", "shots_taken", "handicap")
+        fields = ("username", "holes_played", "shots_taken", "handicap", "percentile")
+
+    def get_percentile(self, obj):
+        # Callers load the histogram once before serializing
+        if not obj.holes_played:
+            return None
+        return handicap_histogram.percentile(obj.handicap)
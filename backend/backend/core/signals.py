@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .achievements import reset_achievement_ids
+from .handicaps import handicap_histogram
+from .models import Achievement, PlayerStats
+
+@receiver(post_delete, sender=PlayerStats)
+def handicap_histogram_remove_signal(sender, instance, **kwargs):
+    # Deleted players (and cascaded user deletes) leave the percentiles
+    handicap_histogram.set(instance.user_id, None)
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def achievement_ids_signal(sender, **kwargs):
+    # Definitions changed; reload the key -> id map on next use
+    reset_achievement_ids()
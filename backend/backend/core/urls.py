@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import player_stats
+from .views import player_stats, player_stats_bulk
 
 urlpatterns = [
+    # matches GET /api/player-stats/?usernames=a,b,c
+    path('player-stats/', player_stats_bulk, name='player-stats-bulk'),
     # matches GET /api/player-stats/<username>/
     path('player-stats/<str:username>/', player_stats, name='player-stats'),
 ]
@@ -1,7 +1,6 @@
 
 import json
 import secrets
-import hashlib
 
 from rest_framework.decorators import api_view
 from .serializers import PlayerStatsSerializer
@@ -15,7 +14,6 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils.timezone import now
 from django.db import models
-from backend.lobby.models import LobbyStatus
 import html
 import os
 from django.conf import settings
@@ -30,6 +28,13 @@ from django.views.decorators.http import require_GET
 from django.utils.decorators import method_decorator
 # Token model (make sure this is in your models.py and migrated)
 from .models import AuthToken
+from .auth import hash_token, invalidate_token, invalidate_user, resolve_token
+from .scores import MAX_BATCH, parse_round, submit_rounds
+from .handicaps import handicap_histogram
+from .achievements import definitions, unlock_achievement, unlocked_keys
+
+# Most usernames one bulk stats request may ask for
+MAX_STATS_USERNAMES = 200
 
 @api_view(["GET"])
 def player_stats(request, username):
@@ -37,16 +42,40 @@ def player_stats(request, username):
     GET /api/player-stats/<username>/
     """
     try:
-        stats = PlayerStats.objects.get(user__username=username)
+        stats = PlayerStats.objects.select_related('user').get(user__username=username)
     except PlayerStats.DoesNotExist:
         return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
 
+    handicap_histogram.ensure_loaded()
     serializer = PlayerStatsSerializer(stats)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
+@api_view(["GET"])
+def player_stats_bulk(request):
+    """
+    GET /api/player-stats/?usernames=a,b,c
 
-def hash_token(token):
-    return hashlib.sha256(token.encode()).hexdigest()
+    Stats for many players in one query, best handicap first. Players
+    who haven't played a hole have no real handicap and come last.
+    """
+    usernames = {name for name in request.GET.get("usernames", "").split(",") if name}
+    if not usernames or len(usernames) > MAX_STATS_USERNAMES:
+        return Response(
+            {"detail": f"Pass between 1 and {MAX_STATS_USERNAMES} usernames"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    stats = list(
+        PlayerStats.objects.filter(user__username__in=usernames).select_related('user')
+        .only('user__username', 'holes_played', 'shots_taken', 'handicap')
+        .order_by(models.Case(models.When(holes_played=0, then=1), default=0), 'handicap')
+    )
+    handicap_histogram.ensure_loaded()
+    found = {entry.user.username for entry in stats}
+    return Response({
+        "players": PlayerStatsSerializer(stats, many=True).data,
+        "missing": sorted(usernames - found),
+    }, status=status.HTTP_200_OK)
 
 def crop(image_path, size=(100, 100)):
     """Crop the image to a square and resize to the target size."""
@@ -73,28 +102,9 @@ class RegisterView(APIView):
         if User.objects.filter(username=username).exists():
             return Response({'message': 'Username already exists'}, status=400)
 
+        # Unlocks are rows in UserAchievement; a new player needs nothing up front
         User.objects.create_user(username=username, password=password)
 
-        # 🔽 Add the new user to achievements.json
-        try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            json_path = os.path.join(base_dir, 'achievements', 'achievements.json')
-
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-
-            if 'users' not in data:
-                data['users'] = {}
-
-            if username not in data['users']:
-                data['users'][username] = []
-
-            with open(json_path, 'w') as f:
-                json.dump(data, f, indent=2)
-
-        except Exception as e:
-            print("⚠️ Failed to update achievements.json:", e)
-
         return Response({'message': 'User registered successfully'}, status=201)
 
 
@@ -116,6 +126,7 @@ class LoginView(APIView):
         # Store the hashed token
         existing_token = AuthToken.objects.filter(user=user).first()
         AuthToken.objects.filter(user=user).delete()
+        invalidate_user(user.id)
 
         #preserves old profile pic if there was one
         AuthToken.objects.create(user=user, token_hash=hashed_token, created_at=now(), profile_image=existing_token.profile_image if existing_token else None, ball_image=existing_token.ball_image if existing_token else None )
@@ -137,12 +148,11 @@ class CheckCookie(APIView):
     def get(self, request):
         auth_token = request.COOKIES.get('auth_token')
         if auth_token:
-            hashed_token = hash_token(auth_token)
-            token = AuthToken.objects.filter(token_hash=hashed_token).first()
-            if token:
+            user = resolve_token(auth_token)
+            if user:
                 return JsonResponse({
                     'authenticated': True,
-                    'username': token.user.username  # ✅ include username
+                    'username': user.username  # ✅ include username
                 })
 
         return JsonResponse({'authenticated': False})
@@ -155,6 +165,7 @@ class Logout(APIView):
             query_obj = AuthToken.objects.get(token_hash=hashed_token)
             query_obj.token_hash = None
             query_obj.save()
+            invalidate_token(auth_token)
             response = HttpResponse("You have been logged out!", status=200)
             response.delete_cookie('auth_token', samesite='Lax')
             return response
@@ -164,102 +175,86 @@ class Logout(APIView):
 
 class Leaderboard(APIView):
     def post(self, request):
-
-        all_lobby_statuses = LobbyStatus.objects.select_related('user').all()
-
-        body = json.loads(request.body)
-        username = body.get("username")
-        total_shots = body.get("totalShots")
-        total_holes = body.get("totalHoles")
-
-
-
-        # Loop through all and find the matching one
-        matching_status = None
-        for status in all_lobby_statuses:
-            if status.user.username == username:
-                matching_status = status
-                break
-
-        if matching_status:
-            # Now you can update the best score
-            # ─── NEW: bump the cumulative counters ───
-            stats, _ = PlayerStats.objects.get_or_create(user=matching_status.user)
-            stats.shots_taken += int(total_shots)
-            stats.holes_played += int(total_holes)
-            stats.save()
-            # ─────────────────────────────────────────
-
-            if (matching_status.best_score == 0) or (matching_status.best_score > total_shots):
-                matching_status.best_score = total_shots
-                matching_status.save()
-
-
-                return HttpResponse("Best score updated", status=200)
-            else:
-                return HttpResponse("That wasn't their best score", status=201)
+        try:
+            username, total_shots, total_holes = parse_round(json.loads(request.body))
+        except (ValueError, TypeError, AttributeError):
+            return HttpResponse("Invalid round result", status=400)
+
+        result = submit_rounds([(username, total_shots, total_holes)])[username]
+        if result == "updated":
+            return HttpResponse("Best score updated", status=200)
+        elif result == "unchanged":
+            return HttpResponse("That wasn't their best score", status=201)
         else:
             return HttpResponse("Player not found", status=404)
 
 
-class AchievementsView(APIView):
-    def get(self, request):
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        json_path = os.path.join(base_dir, 'achievements', 'achievements.json')
+class LeaderboardBatch(APIView):
+    """
+    POST /api/leaderboard/batch {"results": [{username, totalShots, totalHoles}, ...]}
 
-        try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-            return Response(data)
-        except FileNotFoundError:
-            return Response({'error': 'Achievements file not found'}, status=404)
-        except json.JSONDecodeError:
-            return Response({'error': 'Invalid achievements JSON format'}, status=500)
-        
+    Many round results in one transaction, for tournaments and bots.
+    Malformed entries are skipped and listed by index in "rejected".
+    """
     def post(self, request):
         try:
-            payload = json.loads(request.body)
-            username = payload.get('username')
-            achievement_key = payload.get('achievement_key')
-            print("👀 POST payload:", payload)
-
-            if not username or not achievement_key:
-                return JsonResponse({'error': 'Missing username or achievement_key'}, status=400)
-
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            json_path = os.path.join(base_dir, 'achievements', 'achievements.json')
-
-            with open(json_path, 'r') as f:
-                data = json.load(f)
+            entries = json.loads(request.body)["results"]
+        except (ValueError, TypeError, KeyError):
+            return JsonResponse({"error": "Expected {\"results\": [...]}"}, status=400)
+        if not isinstance(entries, list) or len(entries) > MAX_BATCH:
+            return JsonResponse({"error": f"results must be a list of at most {MAX_BATCH}"}, status=400)
+
+        rounds, rejected = [], []
+        for i, entry in enumerate(entries):
+            try:
+                rounds.append(parse_round(entry))
+            except (ValueError, TypeError, AttributeError):
+                rejected.append(i)
 
-            if achievement_key not in [a['key'] for a in data['achievements']]:
-                return JsonResponse({'error': 'Invalid achievement key'}, status=400)
+        return JsonResponse({"results": submit_rounds(rounds), "rejected": rejected})
 
-            if username not in data['users']:
-                data['users'][username] = []
 
-            if achievement_key not in data['users'][username]:
-                data['users'][username].append(achievement_key)
+class AchievementsView(APIView):
+    def get(self, request):
+        """
+        GET /api/achievements/?username=
 
-            with open(json_path, 'w') as f:
-                json.dump(data, f, indent=2)
+        Definitions plus one player's unlocks (the logged-in player by default),
+        in the shape the old achievements.json had: {achievements, users: {name: [keys]}}.
+        """
+        username = request.GET.get('username')
+        if not username:
+            user = resolve_token(request.COOKIES.get('auth_token'))
+            username = user.username if user else None
 
-            return JsonResponse({'status': 'achievement unlocked'})
+        users = {username: unlocked_keys(username)} if username else {}
+        return Response({'achievements': definitions(), 'users': users})
 
+    def post(self, request):
+        try:
+            payload = json.loads(request.body)
         except json.JSONDecodeError:
             return JsonResponse({'error': 'Invalid JSON'}, status=400)
-        except FileNotFoundError:
-            return JsonResponse({'error': 'Achievements file not found'}, status=404)          
+        username = payload.get('username')
+        achievement_key = payload.get('achievement_key')
+
+        if not username or not achievement_key:
+            return JsonResponse({'error': 'Missing username or achievement_key'}, status=400)
+
+        result = unlock_achievement(username, achievement_key)
+        if result == "unknown_achievement":
+            return JsonResponse({'error': 'Invalid achievement key'}, status=400)
+        if result == "unknown_user":
+            return JsonResponse({'error': 'Player not found'}, status=404)
+        return JsonResponse({'status': 'achievement unlocked'})
 
 
 class Avatar(APIView):
     def get(self, request):
         auth_token = request.COOKIES.get('auth_token')
-        if auth_token != None:
-            hashed_token = hash_token(auth_token)
-            query_obj = AuthToken.objects.get(token_hash=hashed_token)
-            query_obj.refresh_from_db()
-            filename = query_obj.profile_image
+        user = resolve_token(auth_token)
+        if user is not None:
+            filename = AuthToken.objects.values_list('profile_image', flat=True).get(user_id=user.user_id)
             if filename != None:
                 file_path = os.path.join(settings.BASE_DIR, 'backend/core/profile_pics', filename)
                 # Check if file exists
@@ -278,14 +273,14 @@ class Avatar(APIView):
     def post(self, request):
 
         auth_token = request.COOKIES.get('auth_token')
-        if auth_token != None:
-            hashed_token = hash_token(auth_token)
-            query_obj = AuthToken.objects.get(token_hash=hashed_token)
+        user = resolve_token(auth_token)
+        if user is not None:
+            query_obj = AuthToken.objects.get(user_id=user.user_id)
             avatar_file = request.FILES.get('avatar')
             if not avatar_file:
                 return HttpResponse("No file uploaded", status=400)
-            filename = f"{query_obj.user.username}_avatar_{avatar_file.name}"
-            player_ball_filename = f"{query_obj.user.username}_ball_{avatar_file.name}"
+            filename = f"{user.username}_avatar_{avatar_file.name}"
+            player_ball_filename = f"{user.username}_ball_{avatar_file.name}"
             save_path = os.path.join(settings.BASE_DIR, 'backend/core/profile_pics', filename)
             save_ball_path = os.path.join(settings.BASE_DIR, 'backend/core/ball_pics', player_ball_filename)
             # Save files manually to disk
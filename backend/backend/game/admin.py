@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import HoleResult, HoleStats, HoleStrokeCount
+
+@admin.register(HoleResult)
+class HoleResultAdmin(admin.ModelAdmin):
+    list_display = ("user", "hole", "strokes", "played_at")
+    search_fields = ("user__username",)
+    list_filter = ("hole",)
+
+@admin.register(HoleStats)
+class HoleStatsAdmin(admin.ModelAdmin):
+    list_display = ("hole", "results", "total_strokes", "total_squares")
+
+@admin.register(HoleStrokeCount)
+class HoleStrokeCountAdmin(admin.ModelAdmin):
+    list_display = ("hole", "strokes", "results")
+    list_filter = ("hole",)
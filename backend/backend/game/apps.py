@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class GameConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "backend.game"
+
+    def ready(self):
+        # Compile hole geometry once so putts never touch the level files
+        from .physics import load_geometry
+        load_geometry()
@@ -1,64 +1,155 @@
 import json
-from channels.generic.websocket import AsyncWebsocketConsumer
+import math
+import re
+import secrets
+from urllib.parse import parse_qs
 from channels.db import database_sync_to_async
-import hashlib
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from django.conf import settings
+
+from backend.core.auth import aresolve_token
 
-@database_sync_to_async
-def get_username(auth_token):
-    from backend.core.models import AuthToken  # 🔒 Safe model import
-    token_hash = hashlib.sha256(auth_token.encode()).hexdigest()
-    return AuthToken.objects.get(token_hash=token_hash).user.username
+from .holestats import MAX_STROKES, record_hole_result
+from .interest import cell_group_name, cell_of, cells_around, interest_settings, party_group_name
+from .outbox import Outbox
+from .physics import get_geometry
+from .presence import get_presence_registry
+from .protocol import negotiate, position_entry, position_quantum, prebuild
+from .ticker import acquire_ticker, release_ticker
+
+
+def session_from_query(scope):
+    # ?session=<id> from the lobby matchmaker; anything else means the open room
+    values = parse_qs(scope.get("query_string", b"").decode()).get("session")
+    if values and re.fullmatch(r"[0-9a-f]{1,16}", values[0]):
+        return values[0]
+    return None
 
 
 class GameConsumer(AsyncWebsocketConsumer):
-    # Dictionary to track players and their current hole
-    player_holes = {}
 
     async def connect(self):
         #self.room_group_name = "game_room"
         self.hole = self.scope["url_route"]["kwargs"]["hole_id"]
         self.room_group_name = f"game_hole_{self.hole}"
+        # 🎯 Players matched in the lobby get a room of their own on each hole
+        self.session = session_from_query(self.scope)
+        if self.session:
+            self.room_group_name = f"game_hole_{self.hole}_s{self.session}"
 
         # 🔐 Get username from cookie token
         auth_token = self.scope["cookies"].get("auth_token")
         if auth_token:
-            try:
-                self.username = await get_username(auth_token)
-            except Exception as e:
+            user = await aresolve_token(auth_token)
+            if user is None:
                 await self.close()
                 return
+            self.username = user.username
+            self.user_id = user.user_id
         else:
             self.username = "Guest"
+            self.user_id = None
+        # Holes already reported on this connection; the table dedupes across connections
+        self.reported_holes = set()
+        self.connection_round = secrets.token_hex(8)
 
         # 📡 Join game group
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
-        await self.accept()
+
+        # 🔌 Binary frames if the client asked for them, JSON otherwise
+        self.codec = negotiate(self.scope.get("subprotocols", []))
+        await self.accept(subprotocol=self.codec.subprotocol)
+
+        # 📤 Everything we send goes through a bounded per-connection queue
+        self.outbox = Outbox(
+            self.write_frame,
+            self.codec.encode_positions,
+            getattr(settings, "GAME_OUTBOX_MAX_FRAMES", 512),
+        )
+        self.outbox.start()
+
+        self.last_position = None
+
+        # 📦 What this client has been sent: player id -> (username, qx, qy)
+        self.client_view = {}
+        self.quantum = position_quantum()
+
+        # 🗺️ Register in the shared presence registry (start at Hole 1 by default)
+        self.current_hole = 1
+        self.presence = get_presence_registry()
+        self.record = await self.presence.join(
+            self.room_group_name, self.channel_name, self.username, self.current_hole
+        )
+        if self.record is None:
+            # Every player id in this room is taken
+            self.outbox.stop()
+            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+            await self.close()
+            return
+
+        # ⏱️ Moves are batched by this hole's tick loop
+        self.ticker = acquire_ticker(self.room_group_name, self.channel_layer, self.hole)
+
+        # 🔭 Only hear moves from the cells around our ball, starting at the tee
+        self.party = None
+        self.interest_cell = None
+        self.interest_groups = set()
+        await self.update_interest(*self.ball_position())
 
         # ✅ Notify client who they are
-        await self.send(text_data=json.dumps({
+        await self.send_frame(json.dumps({
             'type': 'connection_success',
-            'username': self.username
+            'username': self.username,
+            'player_id': self.record.player_id,
+            'quantum': self.quantum,
+        }))
+
+        # 👥 Tell the new player who is already here, across all workers
+        members = await self.presence.members(self.room_group_name)
+        await self.send_frame(json.dumps({
+            'type': 'players_present',
+            'players': [
+                {'username': record.username, 'player_id': record.player_id, 'hole': record.hole}
+                for record in members.values()
+            ],
         }))
 
-        # Initialize player's hole (start at Hole 1 by default)
-        self.player_holes[self.username] = 1  # Hole 1
-        # Notify all players on the same hole about the new player
-        #await self.send_to_hole(self.username, 1)
+        # 📣 Let everyone else map this player's id to a name
+        joined = {
+            'username': self.username,
+            'player_id': self.record.player_id,
+            'hole': self.current_hole,
+        }
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {'type': 'player_joined', **prebuild('joined', joined, binary=False)}
+        )
 
     async def disconnect(self, close_code):
+        # Connection was refused before joining the game
+        if not hasattr(self, 'ticker'):
+            return
+
         # Remove player from hole tracking when they disconnect
-        self.player_holes.pop(self.username, None)
+        await self.presence.leave(self.room_group_name, self.channel_name)
+
+        self.ticker.forget(self.record.player_id)
+        release_ticker(self.room_group_name)
+        self.outbox.stop()
+
+        for group in self.interest_groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+        await self.set_party(None)
 
         # 📣 Notify others that this player left
+        left = {'username': self.username, 'player_id': self.record.player_id}
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
-                'type': 'player_left',
-                'username': self.username
-            }
+            {'type': 'player_left', 'player_id': self.record.player_id, **prebuild('left', left)}
         )
 
         await self.channel_layer.group_discard(
@@ -66,14 +157,22 @@ class GameConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
-    async def receive(self, text_data):
-        data = json.loads(text_data)
+    async def receive(self, text_data=None, bytes_data=None):
+        data = self.codec.decode(text_data, bytes_data)
+        if not isinstance(data, dict):
+            return
         message_type = data.get('type')
 
         if message_type == 'start_game':
-            hole = data.get('hole', 1)
-            GameConsumer.player_holes[self.username] = hole
-            await self.send(text_data=json.dumps({
+            try:
+                hole = int(data.get('hole', 1))
+            except (TypeError, ValueError):
+                hole = 1
+            self.current_hole = hole
+            await self.presence.set_hole(self.room_group_name, self.channel_name, hole)
+            await self.set_party(data.get('party'))
+            await self.update_interest(*self.ball_position(), force=True)
+            await self.send_frame(json.dumps({
                 'type': 'game_start',
                 'hole': hole
             }))
@@ -84,79 +183,187 @@ class GameConsumer(AsyncWebsocketConsumer):
         elif message_type == 'putt':
             await self.handle_putt(data)
 
+        elif message_type == 'resync':
+            await self.send_keyframe()
+
+        elif message_type == 'hole_result':
+            await self.handle_hole_result(data)
+
         elif message_type == 'chat':
+            chat = {'username': self.username, 'message': data.get('message')}
             await self.channel_layer.group_send(
                 self.room_group_name,
-                {
-                    'type': 'chat_message',
-                    'username': self.username,
-                    'message': data.get('message')
-                }
+                {'type': 'chat_message', **prebuild('chat', chat, binary=False)}
             )
 
     async def handle_move(self, data):
-        hole = self.player_holes.get(self.username, 1)
-        # 🟢 Broadcast player movement
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'player_moved',
-                'username': self.username,
-                'x': data.get('x'),
-                'y': data.get('y'),
-                'hole': hole,
-            }
-        )
+        hole = self.current_hole
+        try:
+            x = float(data.get('x'))
+            y = float(data.get('y'))
+        except (TypeError, ValueError):
+            return
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return
+        # 🟢 Keep only the latest position; the ticker broadcasts it
+        self.last_position = (x, y)
+        self.ticker.update(self.record.player_id, self.username, x, y, hole, self.party)
+        await self.update_interest(x, y)
+
+    def round_id(self, data):
+        # The lobby session, else the client's round id, else just this connection
+        if self.session:
+            return self.session
+        round_id = data.get('round')
+        if isinstance(round_id, str) and re.fullmatch(r"[0-9A-Za-z-]{1,36}", round_id):
+            return round_id
+        return self.connection_round
+
+    async def handle_hole_result(self, data):
+        # 🏁 One result per hole per round; guests aren't recorded
+        hole = int(self.hole)
+        try:
+            strokes = int(data.get('strokes'))
+        except (TypeError, ValueError):
+            return
+        if self.user_id is None or hole in self.reported_holes or not 1 <= strokes <= MAX_STROKES:
+            return
+        self.reported_holes.add(hole)
+        await database_sync_to_async(record_hole_result)(self.user_id, hole, strokes, self.round_id(data))
+
+    async def update_interest(self, x, y, force=False):
+        # Re-subscribe only when the ball crosses into a new grid cell
+        cell_size, radius, _, _ = interest_settings()
+        cell = (self.current_hole,) + cell_of(x, y, cell_size)
+        if cell == self.interest_cell and not force:
+            return
+        self.interest_cell = cell
+        groups = {
+            cell_group_name(self.room_group_name, self.current_hole, around)
+            for around in cells_around(cell[1:], radius)
+        }
+        for group in groups - self.interest_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        for group in self.interest_groups - groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+        self.interest_groups = groups
+
+    async def set_party(self, party):
+        # Party members always get each other's moves, wherever they are
+        party = str(party) if party else None
+        if party == self.party:
+            return
+        if self.party:
+            await self.channel_layer.group_discard(
+                party_group_name(self.room_group_name, self.party), self.channel_name
+            )
+        if party:
+            await self.channel_layer.group_add(
+                party_group_name(self.room_group_name, party), self.channel_name
+            )
+        self.party = party
 
     async def handle_putt(self, data):
-        hole = self.player_holes.get(self.username, 1)
-        # ⛳ Broadcast putt action
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'player_putt',
-                'username': self.username,
-                'angle': data.get('angle'),
-                'power': data.get('power'),
-                'hole': hole
-            }
+        hole = self.current_hole
+        try:
+            angle = float(data.get('angle'))
+            power = float(data.get('power'))
+        except (TypeError, ValueError):
+            return
+        start = self.putt_start(data)
+        if not all(math.isfinite(v) for v in (angle, power) + start):
+            return
+
+        # ⛳ Simulated server-side; the ticker broadcasts the trajectory
+        self.ticker.submit_putt(
+            self.record.player_id, self.username, hole, start[0], start[1], angle, power
         )
 
-    # 🧩 Handler: movement
-    async def player_moved(self, event):
-        hole = event['hole']
-        if self.player_holes.get(self.username) == hole:
+    def putt_start(self, data):
+        # Where the client says the ball is, else our best guess
+        x, y = data.get('x'), data.get('y')
+        try:
+            return float(x), float(y)
+        except (TypeError, ValueError):
+            return self.ball_position()
 
-            await self.send(text_data=json.dumps({
-                'type': 'player_moved',
-                'username': event['username'],
-                'x': event['x'],
-                'y': event['y'],
-            }))
+    def ball_position(self):
+        # Last reported move, else the tee
+        if self.last_position is not None:
+            return self.last_position
+        geometry = get_geometry(self.hole)
+        return geometry.start if geometry else (0.0, 0.0)
+
+    async def forward(self, event):
+        # Frames are encoded once by the sender; pick the one for our codec
+        await self.send_frame(event.get(self.codec.frame_key, event['text']))
+
+    async def send_frame(self, frame):
+        if not self.outbox.put(frame):
+            # Can't keep up even with moves merged - drop rather than buffer forever
+            print(f"[Game] Closing slow connection for {self.username}: {self.outbox.stats()}")
+            await self.close(code=1013)
+
+    async def write_frame(self, frame):
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
+
+    async def send_positions(self, event, encode):
+        # Only send players whose quantized position differs from what
+        # this client already has; keyframes resend everything
+        view = self.client_view
+        positions = event['positions']
+        if event.get('keyframe'):
+            changed = positions
+        else:
+            changed = [
+                p for p in positions
+                if view.get(p['player_id']) != (p['username'], p['qx'], p['qy'])
+            ]
+        if not changed:
+            return
+        for p in changed:
+            view[p['player_id']] = (p['username'], p['qx'], p['qy'])
+        if len(changed) == len(positions):
+            frame = event.get(self.codec.frame_key, event['text'])
+        else:
+            frame = encode(changed)
+        self.outbox.put_positions(changed, frame)
+
+    async def send_keyframe(self):
+        positions = [
+            position_entry(username, player_id, qx, qy, self.quantum)
+            for player_id, (username, qx, qy) in self.client_view.items()
+        ]
+        await self.send_frame(self.codec.encode_summary(positions))
+
+    # 🧩 Handler: batched movement, one per tick and cell (or party)
+    async def positions_snapshot(self, event):
+        if event['hole'] is None or self.current_hole == event['hole']:
+            await self.send_positions(event, self.codec.encode_positions)
+
+    # 🧩 Handler: low-rate positions of the whole hole
+    async def positions_summary(self, event):
+        if self.current_hole == event['hole']:
+            await self.send_positions(event, self.codec.encode_summary)
 
     # 🧩 Handler: putt
     async def player_putt(self, event):
-        hole = event['hole']
-        if self.player_holes.get(self.username) == hole:
-
-            await self.send(text_data=json.dumps({
-                'type': 'player_putt',
-                'username': event['username'],
-                'angle': event['angle'],
-                'power': event['power']
-            }))
+        if self.current_hole == event['hole']:
+            await self.forward(event)
 
     # 🧩 Handler: chat
     async def chat_message(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'chat',
-            'username': event['username'],
-            'message': event['message']
-        }))
+        await self.forward(event)
+
+    # 🧩 Handler: player joined
+    async def player_joined(self, event):
+        await self.forward(event)
 
     # 🧩 Handler: player left
     async def player_left(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'player_left',
-            'username': event['username']
-        }))
\ No newline at end of file
+        self.client_view.pop(event['player_id'], None)
+        self.outbox.discard_player(event['player_id'])
+        await self.forward(event)
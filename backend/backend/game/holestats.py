@@ -0,0 +1,89 @@
+import math
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import HoleResult, HoleStats, HoleStrokeCount
+
+# The client stops a hole at 8 shots; anything far past that is bogus
+MAX_STROKES = 20
+
+
+def _bump(model, lookup, changes, **created):
+    # Increment in SQL; create the row the first time, tolerating a concurrent create
+    rows = model.objects.filter(**lookup)
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **created)
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def add_to_aggregates(hole, strokes, results=1):
+    """Fold ``results`` results of ``strokes`` strokes on ``hole`` into its counters."""
+    _bump(
+        HoleStats, {"hole": hole},
+        {
+            "results": F("results") + results,
+            "total_strokes": F("total_strokes") + strokes * results,
+            "total_squares": F("total_squares") + strokes * strokes * results,
+        },
+        results=results, total_strokes=strokes * results, total_squares=strokes * strokes * results,
+    )
+    _bump(
+        HoleStrokeCount, {"hole": hole, "strokes": strokes},
+        {"results": F("results") + results},
+        results=results,
+    )
+
+
+def record_hole_result(user_id, hole, strokes, round_id):
+    """
+    Store one finished hole and update that hole's aggregates with it.
+    Returns False, changing nothing, if this round already has a result
+    for the hole.
+    """
+    try:
+        with transaction.atomic():
+            HoleResult.objects.create(user_id=user_id, hole=hole, strokes=strokes, round=round_id)
+            add_to_aggregates(hole, strokes)
+    except IntegrityError:
+        return False
+    return True
+
+
+def hole_stats(holes=None):
+    """
+    {hole: {results, mean, stddev, histogram, difficulty}} from the
+    aggregate tables: two queries however many results there are.
+    Difficulty 1 is the hole with the highest mean.
+    """
+    totals = HoleStats.objects.order_by('hole')
+    bars = HoleStrokeCount.objects.order_by('hole', 'strokes')
+    if holes is not None:
+        totals = totals.filter(hole__in=holes)
+        bars = bars.filter(hole__in=holes)
+
+    stats = {}
+    for row in totals:
+        if not row.results:
+            continue
+        mean = row.total_strokes / row.results
+        variance = max(row.total_squares / row.results - mean * mean, 0.0)
+        stats[row.hole] = {
+            "hole": row.hole,
+            "results": row.results,
+            "mean": round(mean, 2),
+            "stddev": round(math.sqrt(variance), 2),
+            "histogram": {},
+        }
+    for bar in bars:
+        if bar.hole in stats and bar.results:
+            stats[bar.hole]["histogram"][str(bar.strokes)] = bar.results
+
+    hardest_first = sorted(stats.values(), key=lambda entry: (-entry["mean"], entry["hole"]))
+    for difficulty, entry in enumerate(hardest_first, start=1):
+        entry["difficulty"] = difficulty
+    return stats
@@ -0,0 +1,79 @@
+import re
+
+from django.conf import settings
+
+
+def interest_settings():
+    config = getattr(settings, "GAME_INTEREST", {})
+    return (
+        config.get("CELL_SIZE", 200),
+        config.get("RADIUS", 1),
+        config.get("SUMMARY_EVERY", 20),
+        config.get("KEYFRAME_EVERY", 100),
+    )
+
+
+def cell_of(x, y, cell_size):
+    return int(x // cell_size), int(y // cell_size)
+
+
+def cells_around(cell, radius):
+    cx, cy = cell
+    return {
+        (cx + dx, cy + dy)
+        for dx in range(-radius, radius + 1)
+        for dy in range(-radius, radius + 1)
+    }
+
+
+def cell_group_name(room, hole, cell):
+    # Channel layer group names only allow [a-zA-Z0-9_.-]
+    cx, cy = cell
+    return f"{room}.h{hole}.c{cx}_{cy}".replace("-", "m")
+
+
+def party_group_name(room, party):
+    return f"{room}.p.{re.sub(r'[^a-zA-Z0-9_-]', '', str(party))[:40]}"
+
+
+class SpatialGrid:
+    """
+    Uniform-grid index of the last known ball position on one hole.
+
+    Positions are kept quantized (``qx * quantum`` is the real x). ``move``
+    re-buckets a player (keyed by their per-room id) and returns their ``(hole, cx, cy)`` cell;
+    ``members`` lists who is in a cell. Used by the ticker to route each
+    tick's moves to per-cell groups and to build the low-rate summary.
+    """
+
+    def __init__(self, cell_size, quantum=1.0):
+        self.cell_size = cell_size
+        self.quantum = quantum
+        self.cells = {}
+        self.positions = {}
+
+    def move(self, player_id, username, qx, qy, hole):
+        cell = (hole,) + cell_of(qx * self.quantum, qy * self.quantum, self.cell_size)
+        previous = self.positions.get(player_id)
+        self.positions[player_id] = (username, qx, qy, cell)
+        if previous is not None and previous[3] == cell:
+            return cell
+        if previous is not None:
+            self._discard(player_id, previous[3])
+        self.cells.setdefault(cell, set()).add(player_id)
+        return cell
+
+    def remove(self, player_id):
+        previous = self.positions.pop(player_id, None)
+        if previous is not None:
+            self._discard(player_id, previous[3])
+
+    def members(self, cell):
+        return self.cells.get(cell, set())
+
+    def _discard(self, player_id, cell):
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(player_id)
+            if not members:
+                del self.cells[cell]
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.game.physics import simulate_putts
+from backend.game.protocol import JSON_CODEC, position_entry, position_quantum, prebuild, quantize
+
+
+class Command(BaseCommand):
+    help = "CPU cost per game broadcast: encode per recipient vs encode once"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1,10,50,100,250", help="Comma-separated group sizes")
+        parser.add_argument("--players", type=int, default=8, help="Players per position snapshot")
+        parser.add_argument("--broadcasts", type=int, default=200)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        broadcasts = options["broadcasts"]
+
+        # Same entries the ticker sends: quantized, with x/y derived from them
+        q = position_quantum()
+        snapshot = [
+            position_entry(f'player{i}', i + 1, quantize(100.0 + i, q), quantize(300.0 - i, q), q)
+            for i in range(options["players"])
+        ]
+        result = simulate_putts(1, [(100.0, 300.0, 0.3, 300.0)])[0]
+        putt = {'username': 'player0', 'player_id': 1, 'angle': 0.3, 'power': 300.0, **result}
+        chat = {'username': 'player0', 'message': 'nice shot!'}
+
+        workloads = [
+            ('positions', snapshot, True),
+            ('putt', putt, True),
+            ('chat', chat, False),
+        ]
+
+        self.stdout.write(f"{broadcasts} broadcasts per measurement, CPU us per broadcast")
+        self.stdout.write(
+            f"{'message':<10}{'group':>7}{'per-recipient':>16}{'once json':>12}{'saved':>8}{'once +binary':>14}"
+        )
+        for kind, payload, binary in workloads:
+            encode = getattr(JSON_CODEC, f'encode_{kind}')
+            for size in sizes:
+                # Old path: every recipient's consumer serialises the payload
+                per_recipient = self.time_fanout(broadcasts, size, lambda: None, lambda event: encode(payload))
+
+                # New path: sender encodes once, recipients pick the prebuilt frame.
+                # JSON only first, so it compares like for like with the old path.
+                encode_json = self.time_fanout(
+                    broadcasts, size, lambda: prebuild(kind, payload, binary=False), lambda event: event['text']
+                )
+                line = (
+                    f"{kind:<10}{size:>7}{per_recipient * 1e6:>16.1f}{encode_json * 1e6:>12.1f}"
+                    f"{1 - encode_json / per_recipient if per_recipient else 0.0:>8.0%}"
+                )
+                if binary:
+                    # What the sender pays when it also builds the binary frame
+                    encode_both = self.time_fanout(
+                        broadcasts, size, lambda: prebuild(kind, payload, binary=True), lambda event: event['text']
+                    )
+                    line += f"{encode_both * 1e6:>14.1f}"
+                else:
+                    line += f"{'-':>14}"
+                self.stdout.write(line)
+
+    @staticmethod
+    def time_fanout(broadcasts, size, build, deliver):
+        # Frames go to a sink, standing in for each recipient's send
+        sink = []
+        started = time.process_time()
+        for _ in range(broadcasts):
+            event = build()
+            for _ in range(size):
+                sink.append(deliver(event))
+            sink.clear()
+        return (time.process_time() - started) / broadcasts
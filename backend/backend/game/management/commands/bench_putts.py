@@ -0,0 +1,50 @@
+import math
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.game.physics import get_geometry, simulate_putts
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark for the server-side putt simulator"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hole", type=int, default=1)
+        parser.add_argument("--putts", type=int, default=500, help="Putts per batch")
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=312)
+
+    def handle(self, *args, **options):
+        geometry = get_geometry(options["hole"])
+        if geometry is None:
+            self.stderr.write(f"No level data for hole {options['hole']}")
+            return
+
+        rng = random.Random(options["seed"])
+        start_x, start_y = geometry.start
+        putts = [
+            (start_x, start_y, rng.uniform(-math.pi, math.pi), rng.uniform(100, 600))
+            for _ in range(options["putts"])
+        ]
+
+        # Warm up once so the first round isn't skewed
+        simulate_putts(options["hole"], putts[:10])
+
+        self.stdout.write(f"hole {options['hole']}: best of {options['rounds']} rounds")
+        for size in sorted({1, 10, 100, len(putts)}):
+            if size > len(putts):
+                continue
+            batch = putts[:size]
+            timings = []
+            for _ in range(options["rounds"]):
+                started = time.perf_counter()
+                simulate_putts(options["hole"], batch)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            self.stdout.write(
+                f"  batch of {size:>5}: {best * 1000:8.1f} ms/batch, "
+                f"{size / best:>9,.0f} putts/s, "
+                f"{best / size * 1e6:6.0f} us/putt"
+            )
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HoleStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hole', models.PositiveSmallIntegerField(unique=True)),
+                ('results', models.PositiveIntegerField(default=0)),
+                ('total_strokes', models.PositiveIntegerField(default=0)),
+                ('total_squares', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HoleStrokeCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hole', models.PositiveSmallIntegerField()),
+                ('strokes', models.PositiveSmallIntegerField()),
+                ('results', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hole', 'strokes'), name='holestrokecount_unique_bar')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HoleResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hole', models.PositiveSmallIntegerField()),
+                ('strokes', models.PositiveSmallIntegerField()),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hole_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hole', 'played_at'], name='holeresult_hole_played_idx'), models.Index(fields=['user', 'hole'], name='holeresult_user_hole_idx')],
+            },
+        ),
+    ]
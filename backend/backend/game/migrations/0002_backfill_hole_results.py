@@ -0,0 +1,52 @@
+from collections import Counter
+
+from django.db import migrations
+
+# Same bound as holestats.MAX_STROKES at the time of this migration
+MAX_STROKES = 20
+
+
+def backfill_from_score_by_hole(apps, schema_editor):
+    # Move whatever LobbyStatus.score_by_hole holds ({hole: strokes}) into the tables
+    LobbyStatus = apps.get_model('lobby', 'LobbyStatus')
+    HoleResult = apps.get_model('game', 'HoleResult')
+    HoleStats = apps.get_model('game', 'HoleStats')
+    HoleStrokeCount = apps.get_model('game', 'HoleStrokeCount')
+
+    results = []
+    for user_id, score_by_hole in LobbyStatus.objects.exclude(score_by_hole={}).values_list('user_id', 'score_by_hole'):
+        for hole, strokes in (score_by_hole or {}).items():
+            try:
+                hole, strokes = int(hole), int(strokes)
+            except (TypeError, ValueError):
+                continue
+            if hole > 0 and 1 <= strokes <= MAX_STROKES:
+                results.append(HoleResult(user_id=user_id, hole=hole, strokes=strokes))
+    HoleResult.objects.bulk_create(results, batch_size=1000)
+
+    bars = Counter((result.hole, result.strokes) for result in results)
+    HoleStrokeCount.objects.bulk_create(
+        [HoleStrokeCount(hole=hole, strokes=strokes, results=count) for (hole, strokes), count in bars.items()]
+    )
+    totals = {}
+    for (hole, strokes), count in bars.items():
+        total = totals.setdefault(hole, [0, 0, 0])
+        total[0] += count
+        total[1] += strokes * count
+        total[2] += strokes * strokes * count
+    HoleStats.objects.bulk_create([
+        HoleStats(hole=hole, results=count, total_strokes=strokes, total_squares=squares)
+        for hole, (count, strokes, squares) in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+        ('lobby', '0003_lobbystatus_best_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_from_score_by_hole, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_backfill_hole_results'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='holeresult',
+            name='round',
+            field=models.CharField(blank=True, default='', max_length=36),
+        ),
+        migrations.AddConstraint(
+            model_name='holeresult',
+            constraint=models.UniqueConstraint(fields=('user', 'hole', 'round'), name='holeresult_unique_per_round'),
+        ),
+    ]
@@ -1,3 +1,55 @@
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
 
-# Create your models here.
+
+class HoleResult(models.Model):
+    """Strokes a player took on one hole; one row per hole per round."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hole_results')
+    hole = models.PositiveSmallIntegerField()
+    strokes = models.PositiveSmallIntegerField()
+    # Lobby session id, or the client's round id when playing the open room
+    round = models.CharField(max_length=36, default='', blank=True)
+    played_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # A reconnect or second tab reporting the same hole again is ignored
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'hole', 'round'], name='holeresult_unique_per_round'),
+        ]
+        indexes = [
+            models.Index(fields=['hole', 'played_at'], name='holeresult_hole_played_idx'),
+            models.Index(fields=['user', 'hole'], name='holeresult_user_hole_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - Hole {self.hole} - {self.strokes} strokes"
+
+
+class HoleStats(models.Model):
+    """
+    Running totals for one hole, bumped on every HoleResult. Mean and
+    spread come from count, sum and sum of squares without a scan.
+    """
+    hole = models.PositiveSmallIntegerField(unique=True)
+    results = models.PositiveIntegerField(default=0)
+    total_strokes = models.PositiveIntegerField(default=0)
+    total_squares = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Hole {self.hole} - {self.results} results"
+
+
+class HoleStrokeCount(models.Model):
+    """How many results on a hole took exactly ``strokes``: one histogram bar."""
+    hole = models.PositiveSmallIntegerField()
+    strokes = models.PositiveSmallIntegerField()
+    results = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hole', 'strokes'], name='holestrokecount_unique_bar'),
+        ]
+
+    def __str__(self):
+        return f"Hole {self.hole} - {self.strokes} strokes x {self.results}"
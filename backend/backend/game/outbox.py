@@ -0,0 +1,141 @@
+import asyncio
+from collections import deque
+
+# Queue slot standing in for all coalesced position entries
+POSITIONS = object()
+
+
+class Outbox:
+    """
+    Bounded outbound queue for one game websocket.
+
+    A single writer task drains the queue, so a slow client only ever
+    delays itself. Reliable frames (putts, chat, joins, leaves) are kept
+    in order and never dropped; position updates are merged per player
+    while they wait, so a newer position replaces an unsent older one in
+    place. If reliable frames pile up past ``max_reliable`` the client
+    can't keep up at all and ``put`` returns False so the caller can
+    close the connection instead of buffering without limit.
+
+    Under daphne ``send`` returns as soon as the frame is handed to
+    Twisted, not when the peer has read it, so in practice this bound
+    trips when the event loop itself is starved rather than on a slow
+    TCP peer. If a send raises (the socket is already gone) the writer
+    logs it and the outbox stops; later frames are discarded.
+    """
+
+    def __init__(self, send, encode_positions, max_reliable=512):
+        self._send = send
+        self._encode_positions = encode_positions
+        self.max_reliable = max_reliable
+
+        self.items = deque()
+        self.positions = {}
+        self.queued_frames = 0
+        self.busy = False
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.closed = False
+
+        # Counters
+        self.sent = 0
+        self.dropped = 0
+        self.peak_depth = 0
+
+    @property
+    def depth(self):
+        return self.queued_frames + len(self.positions)
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'peak_depth': self.peak_depth,
+            'sent': self.sent,
+            'dropped': self.dropped,
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        self._close()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _close(self):
+        self.closed = True
+        self.items.clear()
+        self.positions.clear()
+        self.queued_frames = 0
+
+    def put(self, frame):
+        if self.closed:
+            # Nothing will send it; the connection is going away anyway
+            return True
+        if self.queued_frames >= self.max_reliable:
+            return False
+        self.items.append(frame)
+        self.queued_frames += 1
+        self._queued()
+        return True
+
+    def put_positions(self, entries, frame):
+        if self.closed:
+            return
+        # Nothing waiting: send the frame as built (usually the sender's prebuilt one)
+        if not self.items and not self.busy:
+            self.items.append(frame)
+            self.queued_frames += 1
+            self._queued()
+            return
+
+        if not self.positions:
+            self.items.append(POSITIONS)
+        for entry in entries:
+            if entry['player_id'] in self.positions:
+                self.dropped += 1
+            self.positions[entry['player_id']] = entry
+        self._queued()
+
+    def discard_player(self, player_id):
+        # A queued position for a player who has left is stale
+        if self.positions.pop(player_id, None) is not None:
+            self.dropped += 1
+
+    def _queued(self):
+        self.peak_depth = max(self.peak_depth, self.depth)
+        self._wakeup.set()
+
+    async def run(self):
+        while True:
+            if not self.items:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            item = self.items.popleft()
+            if item is POSITIONS:
+                entries = list(self.positions.values())
+                self.positions.clear()
+                if not entries:
+                    continue
+                frame = self._encode_positions(entries)
+            else:
+                self.queued_frames -= 1
+                frame = item
+
+            self.busy = True
+            try:
+                await self._send(frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Game] Outbox send failed, stopping writer: {e}")
+                self._close()
+                self._task = None
+                return
+            finally:
+                self.busy = False
+            self.sent += 1
@@ -0,0 +1,234 @@
+import json
+import math
+import os
+
+from django.conf import settings
+
+# Mirrors the Phaser arcade setup in GameCanvas.jsx
+BALL_RADIUS = 16
+HOLE_RADIUS = 16
+BOUNCE = 0.8
+DRAG = 40.0
+WORLD_WIDTH = 800
+WORLD_HEIGHT = 600
+REST_SPEED = 1.0
+
+STEP = 1.0 / 60.0
+MAX_STEPS = 60 * 30
+KEYFRAME_EVERY = 6
+MAX_POWER = 1000.0
+CELL_SIZE = 64
+
+
+class HoleGeometry:
+    """
+    Collision data for one level, compiled once from ``holeN.json``.
+
+    Walls are stored as ``(left, top, right, bottom)`` boxes and bucketed
+    into a uniform grid. Each cell lists the walls that come within one
+    ball radius of it, so a ball only tests the handful of walls around
+    the cell its centre is in.
+    """
+
+    def __init__(self, hole_id, level):
+        self.hole_id = hole_id
+        self.start = (float(level['ballStart']['x']), float(level['ballStart']['y']))
+        self.cup = (float(level['holePosition']['x']), float(level['holePosition']['y']))
+
+        self.walls = []
+        for obs in level.get('obstacles', []):
+            half_w = obs['width'] / 2.0
+            half_h = obs['height'] / 2.0
+            self.walls.append((
+                obs['x'] - half_w,
+                obs['y'] - half_h,
+                obs['x'] + half_w,
+                obs['y'] + half_h,
+            ))
+
+        self.cols = int(math.ceil(WORLD_WIDTH / CELL_SIZE))
+        self.rows = int(math.ceil(WORLD_HEIGHT / CELL_SIZE))
+        cells = [[] for _ in range(self.cols * self.rows)]
+        for index, (left, top, right, bottom) in enumerate(self.walls):
+            c0 = self._col(left - BALL_RADIUS)
+            c1 = self._col(right + BALL_RADIUS)
+            r0 = self._row(top - BALL_RADIUS)
+            r1 = self._row(bottom + BALL_RADIUS)
+            for row in range(r0, r1 + 1):
+                for col in range(c0, c1 + 1):
+                    cells[row * self.cols + col].append(index)
+        self.grid = [tuple(self.walls[i] for i in cell) for cell in cells]
+
+    def _col(self, x):
+        return min(max(int(x // CELL_SIZE), 0), self.cols - 1)
+
+    def _row(self, y):
+        return min(max(int(y // CELL_SIZE), 0), self.rows - 1)
+
+    def walls_near(self, x, y):
+        return self.grid[self._row(y) * self.cols + self._col(x)]
+
+
+_geometry = {}
+
+
+def load_geometry(levels_dir=None):
+    """Compile every ``holeN.json`` in the levels folder into the cache."""
+    levels_dir = levels_dir or settings.GAME_LEVELS_DIR
+    if not os.path.isdir(levels_dir):
+        return _geometry
+    for filename in os.listdir(levels_dir):
+        name, ext = os.path.splitext(filename)
+        if ext != '.json' or not name.startswith('hole'):
+            continue
+        try:
+            hole_id = int(name[len('hole'):])
+            with open(os.path.join(levels_dir, filename), 'r') as f:
+                _geometry[hole_id] = HoleGeometry(hole_id, json.load(f))
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"⚠️ Skipping level {filename}: {e}")
+    return _geometry
+
+
+def get_geometry(hole_id):
+    if not _geometry:
+        load_geometry()
+    return _geometry.get(int(hole_id))
+
+
+def _collide_walls(x, y, vx, vy, walls):
+    for left, top, right, bottom in walls:
+        # Closest point on the wall box to the ball centre
+        cx = min(max(x, left), right)
+        cy = min(max(y, top), bottom)
+        dx = x - cx
+        dy = y - cy
+        dist_sq = dx * dx + dy * dy
+        if dist_sq >= BALL_RADIUS * BALL_RADIUS:
+            continue
+        if dist_sq > 0.0:
+            dist = math.sqrt(dist_sq)
+            nx = dx / dist
+            ny = dy / dist
+            overlap = BALL_RADIUS - dist
+        else:
+            # Centre is inside the box: push out through the nearest side
+            exits = (
+                (x - left, -1.0, 0.0),
+                (right - x, 1.0, 0.0),
+                (y - top, 0.0, -1.0),
+                (bottom - y, 0.0, 1.0),
+            )
+            depth, nx, ny = min(exits)
+            overlap = depth + BALL_RADIUS
+        x += nx * overlap
+        y += ny * overlap
+        along = vx * nx + vy * ny
+        if along < 0.0:
+            vx -= (1.0 + BOUNCE) * along * nx
+            vy -= (1.0 + BOUNCE) * along * ny
+    return x, y, vx, vy
+
+
+def simulate_putts(hole_id, putts):
+    """
+    Resolve a batch of putts on one hole.
+
+    ``putts`` is a list of ``(x, y, angle, power)`` tuples. All balls are
+    advanced together in lock-step over flat per-ball arrays; balls drop
+    out of the active set as soon as they stop or fall in the cup.
+
+    Returns one dict per putt with ``keyframes`` (``[t, x, y]`` triples),
+    the ``final`` resting position and whether the ball was ``sunk``.
+    """
+    geometry = get_geometry(hole_id)
+    count = len(putts)
+    xs = [0.0] * count
+    ys = [0.0] * count
+    vxs = [0.0] * count
+    vys = [0.0] * count
+    sunk = [False] * count
+    keyframes = [[] for _ in range(count)]
+
+    for i, (x, y, angle, power) in enumerate(putts):
+        power = min(max(float(power), 0.0), MAX_POWER)
+        xs[i] = float(x)
+        ys[i] = float(y)
+        vxs[i] = math.cos(angle) * power
+        vys[i] = math.sin(angle) * power
+        keyframes[i].append([0.0, round(xs[i], 1), round(ys[i], 1)])
+
+    if geometry is not None:
+        cup_x, cup_y = geometry.cup
+    drag_step = DRAG * STEP
+    min_x = BALL_RADIUS
+    max_x = WORLD_WIDTH - BALL_RADIUS
+    min_y = BALL_RADIUS
+    max_y = WORLD_HEIGHT - BALL_RADIUS
+
+    active = [i for i in range(count) if vxs[i] * vxs[i] + vys[i] * vys[i] >= REST_SPEED * REST_SPEED]
+    step = 0
+    while active and step < MAX_STEPS:
+        step += 1
+        still_moving = []
+        for i in active:
+            vx = vxs[i]
+            vy = vys[i]
+
+            # Linear per-axis drag, like Phaser's setDrag
+            if vx > 0.0:
+                vx = max(0.0, vx - drag_step)
+            elif vx < 0.0:
+                vx = min(0.0, vx + drag_step)
+            if vy > 0.0:
+                vy = max(0.0, vy - drag_step)
+            elif vy < 0.0:
+                vy = min(0.0, vy + drag_step)
+
+            x = xs[i] + vx * STEP
+            y = ys[i] + vy * STEP
+
+            # World bounds
+            if x < min_x:
+                x, vx = min_x, -vx * BOUNCE
+            elif x > max_x:
+                x, vx = max_x, -vx * BOUNCE
+            if y < min_y:
+                y, vy = min_y, -vy * BOUNCE
+            elif y > max_y:
+                y, vy = max_y, -vy * BOUNCE
+
+            if geometry is not None:
+                x, y, vx, vy = _collide_walls(x, y, vx, vy, geometry.walls_near(x, y))
+
+                # Cup is a HOLE_RADIUS box, same as the client overlap check
+                if abs(x - cup_x) < HOLE_RADIUS + BALL_RADIUS and abs(y - cup_y) < HOLE_RADIUS + BALL_RADIUS:
+                    x, y, vx, vy = cup_x, cup_y, 0.0, 0.0
+                    sunk[i] = True
+
+            xs[i] = x
+            ys[i] = y
+            vxs[i] = vx
+            vys[i] = vy
+
+            moving = not sunk[i] and vx * vx + vy * vy >= REST_SPEED * REST_SPEED
+            if moving:
+                still_moving.append(i)
+                if step % KEYFRAME_EVERY == 0:
+                    keyframes[i].append([round(step * STEP, 3), round(x, 1), round(y, 1)])
+            else:
+                keyframes[i].append([round(step * STEP, 3), round(x, 1), round(y, 1)])
+        active = still_moving
+
+    # Anything still rolling at the step cap stops where it is
+    for i in active:
+        keyframes[i].append([round(step * STEP, 3), round(xs[i], 1), round(ys[i], 1)])
+
+    return [
+        {
+            'keyframes': keyframes[i],
+            'final': {'x': round(xs[i], 1), 'y': round(ys[i], 1)},
+            'sunk': sunk[i],
+        }
+        for i in range(count)
+    ]
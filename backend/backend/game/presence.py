@@ -0,0 +1,229 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# Compact per-connection record: a small per-room id, the hole being played
+# and who is playing it
+PlayerRecord = namedtuple("PlayerRecord", ["player_id", "hole", "username"])
+
+MAX_PLAYER_ID = 0xFFFF
+
+
+class BasePresenceRegistry:
+    """
+    Tracks which players are in which ``game_hole_{id}`` room.
+
+    Records are keyed by room and connection (the consumer's channel
+    name), not username: guests all share one name and a player may have
+    several tabs open. Each connection gets a small integer id on join
+    that stays stable until it leaves the room. Ids are handed out
+    round-robin and skip any still held by a connection in the room;
+    ``join`` returns None if every id is taken.
+    """
+
+    async def join(self, room, connection, username, hole):
+        raise NotImplementedError
+
+    async def set_hole(self, room, connection, hole):
+        raise NotImplementedError
+
+    async def get(self, room, connection):
+        raise NotImplementedError
+
+    async def leave(self, room, connection):
+        raise NotImplementedError
+
+    async def members(self, room):
+        raise NotImplementedError
+
+
+class InMemoryPresenceRegistry(BasePresenceRegistry):
+    """
+    Registry held in this process only.
+
+    Fine for a single worker, and the local stand-in for the shared
+    backend in tests and development.
+    """
+
+    def __init__(self, **config):
+        self.rooms = {}
+        self.next_ids = {}
+        self.taken_ids = {}
+
+    async def join(self, room, connection, username, hole):
+        players = self.rooms.setdefault(room, {})
+        record = players.get(connection)
+        if record is None:
+            taken = self.taken_ids.setdefault(room, set())
+            if len(taken) >= MAX_PLAYER_ID:
+                if not players:
+                    del self.rooms[room]
+                return None
+            player_id = self.next_ids.get(room, 0)
+            while True:
+                player_id = player_id % MAX_PLAYER_ID + 1
+                if player_id not in taken:
+                    break
+            self.next_ids[room] = player_id
+            taken.add(player_id)
+            record = players[connection] = PlayerRecord(player_id, hole, username)
+        return record
+
+    async def set_hole(self, room, connection, hole):
+        players = self.rooms.get(room, {})
+        record = players.get(connection)
+        if record is not None:
+            record = players[connection] = record._replace(hole=hole)
+        return record
+
+    async def get(self, room, connection):
+        return self.rooms.get(room, {}).get(connection)
+
+    async def leave(self, room, connection):
+        players = self.rooms.get(room)
+        if players is None:
+            return
+        record = players.pop(connection, None)
+        if record is not None:
+            self.taken_ids[room].discard(record.player_id)
+        if not players:
+            del self.rooms[room]
+            self.next_ids.pop(room, None)
+            self.taken_ids.pop(room, None)
+
+    async def members(self, room):
+        return dict(self.rooms.get(room, {}))
+
+
+# Records are stored as "player_id:hole:username" strings in one hash per
+# room keyed by connection, next to the id counter and a hash of the ids
+# currently held
+JOIN_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current then return current end
+local limit = tonumber(ARGV[4])
+if redis.call('HLEN', KEYS[3]) >= limit then return false end
+local player_id
+repeat
+    player_id = redis.call('INCR', KEYS[2])
+    if player_id > limit then
+        player_id = 1
+        redis.call('SET', KEYS[2], player_id)
+    end
+until redis.call('HSETNX', KEYS[3], player_id, ARGV[1]) == 1
+local record = player_id .. ':' .. ARGV[3] .. ':' .. ARGV[2]
+redis.call('HSET', KEYS[1], ARGV[1], record)
+for _, key in ipairs(KEYS) do
+    redis.call('EXPIRE', key, ARGV[5])
+end
+return record
+"""
+
+SET_HOLE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then return false end
+local player_id, username = string.match(current, '^(%d+):[^:]*:(.*)$')
+local record = player_id .. ':' .. ARGV[2] .. ':' .. username
+redis.call('HSET', KEYS[1], ARGV[1], record)
+for _, key in ipairs(KEYS) do
+    redis.call('EXPIRE', key, ARGV[3])
+end
+return record
+"""
+
+LEAVE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current then
+    redis.call('HDEL', KEYS[3], string.match(current, '^(%d+):'))
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+if redis.call('HLEN', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[2], KEYS[3])
+end
+"""
+
+
+def _parse(raw):
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode()
+    player_id, hole, username = raw.split(":", 2)
+    return PlayerRecord(int(player_id), int(hole), username)
+
+
+class RedisPresenceRegistry(BasePresenceRegistry):
+    """
+    Registry shared by every worker through Redis.
+
+    Each room is one hash of ``connection -> "player_id:hole:username"``
+    plus a hash of ``player_id -> connection`` used to skip ids still in
+    use. Keys expire after ``expiry`` seconds without writes so a crashed
+    worker can't leave players behind forever.
+    """
+
+    def __init__(self, host="redis", port=6379, db=0, prefix="game:presence", expiry=3600):
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.Redis(host=host, port=port, db=db)
+        self.prefix = prefix
+        self.expiry = expiry
+        self._join = self.client.register_script(JOIN_SCRIPT)
+        self._set_hole = self.client.register_script(SET_HOLE_SCRIPT)
+        self._leave = self.client.register_script(LEAVE_SCRIPT)
+
+    def _keys(self, room):
+        return [f"{self.prefix}:{room}", f"{self.prefix}:{room}:ids", f"{self.prefix}:{room}:owners"]
+
+    async def join(self, room, connection, username, hole):
+        raw = await self._join(
+            keys=self._keys(room),
+            args=[connection, username, hole, MAX_PLAYER_ID, self.expiry],
+        )
+        return _parse(raw)
+
+    async def set_hole(self, room, connection, hole):
+        raw = await self._set_hole(
+            keys=self._keys(room),
+            args=[connection, hole, self.expiry],
+        )
+        return _parse(raw)
+
+    async def get(self, room, connection):
+        return _parse(await self.client.hget(self._keys(room)[0], connection))
+
+    async def leave(self, room, connection):
+        await self._leave(keys=self._keys(room), args=[connection])
+
+    async def members(self, room):
+        raw = await self.client.hgetall(self._keys(room)[0])
+        return {
+            (name.decode() if isinstance(name, bytes) else name): _parse(record)
+            for name, record in raw.items()
+        }
+
+
+_registry = None
+
+
+def get_presence_registry():
+    """Build the registry configured in ``settings.GAME_PRESENCE`` once per process."""
+    global _registry
+    if _registry is None:
+        config = getattr(settings, "GAME_PRESENCE", {})
+        backend = import_string(
+            config.get("BACKEND", "backend.game.presence.InMemoryPresenceRegistry")
+        )
+        _registry = backend(**config.get("CONFIG", {}))
+    return _registry
+
+
+@receiver(setting_changed)
+def reset_presence_registry(setting, **kwargs):
+    # Lets benchmarks and tests swap backends with override_settings
+    global _registry
+    if setting == "GAME_PRESENCE":
+        _registry = None
@@ -0,0 +1,199 @@
+import json
+import struct
+
+from django.conf import settings
+
+# Offered by clients in Sec-WebSocket-Protocol
+JSON_SUBPROTOCOL = "golf.json.v1"
+BINARY_SUBPROTOCOL = "golf.bin.v1"
+
+# Binary opcodes - first byte of every binary frame
+OP_POSITIONS = 0x01
+OP_PUTT = 0x02
+OP_LEFT = 0x03
+OP_SUMMARY = 0x04
+OP_MOVE = 0x11
+OP_PUTT_REQUEST = 0x12
+
+INT16_MIN = -0x8000
+INT16_MAX = 0x7FFF
+
+# All multi-byte fields are little-endian
+HEADER = struct.Struct("<BH")          # opcode, count / player id
+POSITION = struct.Struct("<Hhh")       # player id, quantized x, quantized y
+PUTT = struct.Struct("<BHffBffH")      # opcode, player id, angle, power, sunk, final x, final y, keyframe count
+KEYFRAME = struct.Struct("<fff")       # t, x, y
+MOVE = struct.Struct("<Bff")           # opcode, x, y
+PUTT_REQUEST = struct.Struct("<Bffff")  # opcode, angle, power, x, y
+
+
+def position_quantum():
+    return getattr(settings, "GAME_POSITION_QUANTUM", 0.5)
+
+
+def quantize(value, quantum):
+    return min(max(int(round(value / quantum)), INT16_MIN), INT16_MAX)
+
+
+def position_entry(username, player_id, qx, qy, quantum):
+    """One player in a positions frame; JSON uses x/y, binary uses qx/qy."""
+    return {
+        'username': username,
+        'player_id': player_id,
+        'qx': qx,
+        'qy': qy,
+        'x': round(qx * quantum, 3),
+        'y': round(qy * quantum, 3),
+    }
+
+
+class JsonCodec:
+    """Default text protocol - one JSON object per frame."""
+
+    subprotocol = None
+    # Key of the prebuilt frame this codec forwards, see prebuild()
+    frame_key = 'text'
+
+    def decode(self, text_data=None, bytes_data=None):
+        if text_data is None:
+            return None
+        return json.loads(text_data)
+
+    def encode_positions(self, positions):
+        return json.dumps({
+            'type': 'positions_snapshot',
+            'positions': [
+                {'username': p['username'], 'x': p['x'], 'y': p['y']}
+                for p in positions
+            ],
+        })
+
+    def encode_summary(self, positions):
+        return json.dumps({
+            'type': 'positions_summary',
+            'positions': [
+                {'username': p['username'], 'x': p['x'], 'y': p['y']}
+                for p in positions
+            ],
+        })
+
+    def encode_putt(self, event):
+        return json.dumps({
+            'type': 'player_putt',
+            'username': event['username'],
+            'angle': event['angle'],
+            'power': event['power'],
+            'keyframes': event['keyframes'],
+            'final': event['final'],
+            'sunk': event['sunk'],
+        })
+
+    def encode_left(self, event):
+        return json.dumps({
+            'type': 'player_left',
+            'username': event['username'],
+        })
+
+    def encode_joined(self, event):
+        return json.dumps({
+            'type': 'player_joined',
+            'username': event['username'],
+            'player_id': event['player_id'],
+            'hole': event['hole'],
+        })
+
+    def encode_chat(self, event):
+        return json.dumps({
+            'type': 'chat',
+            'username': event['username'],
+            'message': event['message'],
+        })
+
+
+class BinaryCodec(JsonCodec):
+    """
+    Compact struct-packed frames for the move/putt hot path.
+
+    Usernames are replaced by the per-room player ids handed out by the
+    presence registry; clients learn the mapping from the JSON
+    ``connection_success``, ``players_present`` and ``player_joined``
+    messages. Anything without a binary form (chat, game_start, ...)
+    still travels as a JSON text frame.
+    """
+
+    subprotocol = BINARY_SUBPROTOCOL
+    frame_key = 'bytes'
+
+    def decode(self, text_data=None, bytes_data=None):
+        if bytes_data is None:
+            return super().decode(text_data)
+        if not bytes_data:
+            return None
+        opcode = bytes_data[0]
+        try:
+            if opcode == OP_MOVE:
+                _, x, y = MOVE.unpack(bytes_data)
+                return {'type': 'move', 'x': x, 'y': y}
+            if opcode == OP_PUTT_REQUEST:
+                _, angle, power, x, y = PUTT_REQUEST.unpack(bytes_data)
+                return {'type': 'putt', 'angle': angle, 'power': power, 'x': x, 'y': y}
+        except struct.error:
+            return None
+        return None
+
+    def encode_positions(self, positions, opcode=OP_POSITIONS):
+        frame = bytearray(HEADER.pack(opcode, len(positions)))
+        for p in positions:
+            frame += POSITION.pack(p['player_id'], p['qx'], p['qy'])
+        return bytes(frame)
+
+    def encode_summary(self, positions):
+        return self.encode_positions(positions, OP_SUMMARY)
+
+    def encode_putt(self, event):
+        final = event['final']
+        keyframes = event['keyframes']
+        frame = bytearray(PUTT.pack(
+            OP_PUTT,
+            event['player_id'],
+            event['angle'],
+            event['power'],
+            1 if event['sunk'] else 0,
+            final['x'],
+            final['y'],
+            len(keyframes),
+        ))
+        for t, x, y in keyframes:
+            frame += KEYFRAME.pack(t, x, y)
+        return bytes(frame)
+
+    def encode_left(self, event):
+        return HEADER.pack(OP_LEFT, event['player_id'])
+
+
+JSON_CODEC = JsonCodec()
+BINARY_CODEC = BinaryCodec()
+
+
+def prebuild(kind, payload, binary=True):
+    """
+    Encode an outbound message once, before it is fanned out.
+
+    Returns the frames to put on the group event: ``text`` for JSON
+    clients and, when the message has a binary form, ``bytes`` for
+    binary clients. Recipients just forward the frame for their codec.
+    """
+    frames = {'text': getattr(JSON_CODEC, f'encode_{kind}')(payload)}
+    if binary:
+        frames['bytes'] = getattr(BINARY_CODEC, f'encode_{kind}')(payload)
+    return frames
+
+
+def negotiate(subprotocols):
+    """Pick a codec from the subprotocols the client offered, JSON by default."""
+    if BINARY_SUBPROTOCOL in subprotocols:
+        return BinaryCodec()
+    codec = JsonCodec()
+    if JSON_SUBPROTOCOL in subprotocols:
+        codec.subprotocol = JSON_SUBPROTOCOL
+    return codec
@@ -1,3 +1,150 @@
-from django.test import TestCase
+import asyncio
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import presence
+from .outbox import Outbox
+from .presence import InMemoryPresenceRegistry
+from .ticker import HoleTicker
+
+
+def entry(player_id, qx):
+    return {'username': f'p{player_id}', 'player_id': player_id, 'qx': qx, 'qy': 0}
+
+
+class OutboxTests(SimpleTestCase):
+    def make(self, max_reliable=4):
+        self.sent = []
+        self.release = asyncio.Event()
+
+        async def send(frame):
+            # Holds the first frame "on the wire" until the test releases it
+            await self.release.wait()
+            self.sent.append(frame)
+
+        def encode(entries):
+            return ('positions', [(e['player_id'], e['qx']) for e in entries])
+
+        outbox = Outbox(send, encode, max_reliable)
+        outbox.start()
+        self.addCleanup(outbox.stop)
+        return outbox
+
+    async def drain(self, outbox):
+        self.release.set()
+        while outbox.items or outbox.busy:
+            await asyncio.sleep(0)
+
+    async def test_positions_merge_per_player_while_waiting(self):
+        outbox = self.make()
+        outbox.put('chat 1')
+        await asyncio.sleep(0)
+        outbox.put_positions([entry(1, 10), entry(2, 20)], 'prebuilt')
+        outbox.put_positions([entry(1, 11)], 'prebuilt')
+        outbox.put('chat 2')
+        outbox.put_positions([entry(2, 21)], 'prebuilt')
+        self.assertEqual(outbox.dropped, 2)
+
+        await self.drain(outbox)
+        # One merged positions frame in the slot of the first update, newest values only
+        self.assertEqual(self.sent, ['chat 1', ('positions', [(1, 11), (2, 21)]), 'chat 2'])
+
+    async def test_idle_outbox_sends_the_prebuilt_frame(self):
+        outbox = self.make()
+        outbox.put_positions([entry(1, 10)], 'prebuilt')
+        await self.drain(outbox)
+        self.assertEqual(self.sent, ['prebuilt'])
+
+    async def test_left_player_is_dropped_from_waiting_positions(self):
+        outbox = self.make()
+        outbox.put('chat')
+        await asyncio.sleep(0)
+        outbox.put_positions([entry(1, 10), entry(2, 20)], 'prebuilt')
+        outbox.discard_player(1)
+        await self.drain(outbox)
+        self.assertEqual(self.sent, ['chat', ('positions', [(2, 20)])])
+
+    async def test_reliable_frames_are_bounded(self):
+        outbox = self.make(max_reliable=3)
+        self.assertTrue(all(outbox.put(f'frame {i}') for i in range(3)))
+        self.assertFalse(outbox.put('one too many'))
+        # Merged positions don't count against the limit
+        outbox.put_positions([entry(1, 10)], 'prebuilt')
+        self.assertEqual(outbox.depth, 4)
+
+    async def test_failed_send_stops_the_outbox(self):
+        async def send(frame):
+            raise ConnectionError("gone")
+
+        outbox = Outbox(send, lambda entries: entries, 4)
+        outbox.start()
+        outbox.put('frame')
+        await asyncio.sleep(0)
+        self.assertTrue(outbox.closed)
+        self.assertTrue(outbox.put('after'))
+        self.assertEqual(outbox.depth, 0)
+
+
+class PresenceIdTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = InMemoryPresenceRegistry()
+
+    async def test_guests_on_separate_connections_get_their_own_ids(self):
+        first = await self.registry.join('room', 'chan-1', 'Guest', 1)
+        second = await self.registry.join('room', 'chan-2', 'Guest', 1)
+        self.assertNotEqual(first.player_id, second.player_id)
+
+        await self.registry.leave('room', 'chan-1')
+        members = await self.registry.members('room')
+        self.assertEqual(list(members), ['chan-2'])
+
+        third = await self.registry.join('room', 'chan-3', 'Guest', 1)
+        self.assertNotEqual(third.player_id, second.player_id)
+
+    async def test_join_again_keeps_the_id(self):
+        first = await self.registry.join('room', 'chan-1', 'ana', 1)
+        again = await self.registry.join('room', 'chan-1', 'ana', 2)
+        self.assertEqual(again, first)
+
+    async def test_ids_wrap_around_and_skip_live_ones(self):
+        self.patch_max_id(3)
+        ids = [(await self.registry.join('room', f'chan-{i}', 'p', 1)).player_id for i in range(3)]
+        self.assertEqual(ids, [1, 2, 3])
+        self.assertIsNone(await self.registry.join('room', 'chan-full', 'p', 1))
+
+        await self.registry.leave('room', 'chan-1')
+        # Wraps past 3 and takes the only free id
+        self.assertEqual((await self.registry.join('room', 'chan-3b', 'p', 1)).player_id, 2)
+
+    def patch_max_id(self, value):
+        original = presence.MAX_PLAYER_ID
+        presence.MAX_PLAYER_ID = value
+        self.addCleanup(setattr, presence, 'MAX_PLAYER_ID', original)
+
+
+class PuttQueueTests(SimpleTestCase):
+    def make(self, **limits):
+        return HoleTicker('game_hole_1', channel_layer=None, tick_rate=20, hole_id=1, **limits)
+
+    def test_newer_putt_replaces_the_waiting_one_in_place(self):
+        ticker = self.make()
+        ticker.submit_putt(1, 'ana', 1, 0.0, 0.0, 0.0, 100.0)
+        ticker.submit_putt(2, 'bo', 1, 0.0, 0.0, 0.0, 100.0)
+        ticker.submit_putt(1, 'ana', 1, 0.0, 0.0, 0.0, 300.0)
+        self.assertEqual(list(ticker.putts), [1, 2])
+        self.assertEqual(ticker.putts[1][-1], 300.0)
+
+    def test_putts_past_the_cap_are_dropped_and_counted(self):
+        ticker = self.make(max_queued_putts=2)
+        self.assertTrue(ticker.submit_putt(1, 'a', 1, 0.0, 0.0, 0.0, 100.0))
+        self.assertTrue(ticker.submit_putt(2, 'b', 1, 0.0, 0.0, 0.0, 100.0))
+        self.assertFalse(ticker.submit_putt(3, 'c', 1, 0.0, 0.0, 0.0, 100.0))
+        # A player already waiting can still replace their putt
+        self.assertTrue(ticker.submit_putt(1, 'a', 1, 0.0, 0.0, 0.0, 200.0))
+        self.assertEqual(ticker.dropped_putts, 1)
+
+    def test_forget_drops_the_waiting_putt(self):
+        ticker = self.make()
+        ticker.submit_putt(1, 'a', 1, 0.0, 0.0, 0.0, 100.0)
+        ticker.forget(1)
+        self.assertEqual(ticker.putts, {})
@@ -0,0 +1,216 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .interest import SpatialGrid, cell_group_name, interest_settings, party_group_name
+from .physics import simulate_putts
+from .protocol import position_entry, position_quantum, prebuild, quantize
+
+
+class HoleTicker:
+    """
+    Fixed-rate publisher for one ``game_hole_{id}`` group.
+
+    Consumers hand their latest ball position to the ticker instead of
+    broadcasting every ``move`` frame. Once per tick the ticker sends a
+    single ``positions_snapshot`` holding the newest position of every
+    player that moved since the previous tick, so the fan-out cost is
+    capped by the tick rate rather than by how fast clients send.
+
+    Moves are routed by a uniform grid: each cell has its own group, and
+    consumers only join the cells around their ball (plus their party's
+    group). Everyone in the room still gets a low-rate
+    ``positions_summary`` of every ball on their hole.
+
+    Putts queued during a tick are simulated together as one batch and
+    each resolved trajectory is broadcast as a ``player_putt``. At most
+    ``max_putts`` are simulated per tick; the rest carry over in order so
+    a burst of putts can't stall the position snapshots. Each player has
+    at most one putt waiting (a newer one replaces it in its place in the
+    queue) and no more than ``max_queued_putts`` players can wait at once;
+    putts past that are dropped and counted.
+    """
+
+    def __init__(self, group_name, channel_layer, tick_rate, hole_id, max_putts=16, max_queued_putts=256):
+        self.group_name = group_name
+        self.channel_layer = channel_layer
+        self.interval = 1.0 / tick_rate
+        self.hole_id = hole_id
+        self.subscribers = 0
+        self.pending = {}
+        self.putts = {}
+        self.max_putts = max_putts
+        self.max_queued_putts = max_queued_putts
+        self.dropped_putts = 0
+        self._task = None
+
+        cell_size, _, self.summary_every, self.keyframe_every = interest_settings()
+        self.quantum = position_quantum()
+        self.grid = SpatialGrid(cell_size, self.quantum)
+        self.ticks = 0
+
+    def update(self, player_id, username, x, y, hole, party=None):
+        # Later moves in the same tick simply overwrite earlier ones
+        self.pending[player_id] = (username, x, y, hole, party)
+
+    def submit_putt(self, player_id, username, hole, x, y, angle, power):
+        """Queue a putt; returns False if the queue is full and it was dropped."""
+        if player_id not in self.putts and len(self.putts) >= self.max_queued_putts:
+            self.dropped_putts += 1
+            return False
+        self.putts[player_id] = (username, player_id, hole, x, y, angle, power)
+        return True
+
+    def forget(self, player_id):
+        self.pending.pop(player_id, None)
+        self.putts.pop(player_id, None)
+        self.grid.remove(player_id)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += self.interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[GameTicker] {self.group_name} tick failed: {e}")
+
+    async def flush(self):
+        self.ticks += 1
+        if self.putts:
+            await self.flush_putts()
+        if self.pending:
+            await self.flush_positions()
+        if self.ticks % self.summary_every == 0 and self.grid.positions:
+            await self.flush_summary(keyframe=self.ticks % self.keyframe_every == 0)
+
+    async def flush_positions(self):
+        positions, self.pending = self.pending, {}
+
+        # Route each move to the group of the grid cell it landed in, and
+        # to the mover's party so teammates always see each other
+        by_cell = {}
+        by_party = {}
+        for player_id, (username, x, y, hole, party) in positions.items():
+            qx = quantize(x, self.quantum)
+            qy = quantize(y, self.quantum)
+            previous = self.grid.positions.get(player_id)
+            if previous is not None and previous[1:3] == (qx, qy) and previous[3][0] == hole:
+                # Hasn't moved at the grid resolution, nothing to send
+                continue
+            cell = self.grid.move(player_id, username, qx, qy, hole)
+            entry = position_entry(username, player_id, qx, qy, self.quantum)
+            by_cell.setdefault(cell, []).append(entry)
+            if party:
+                by_party.setdefault(party, []).append(entry)
+
+        for (hole, cx, cy), entries in by_cell.items():
+            await self.channel_layer.group_send(
+                cell_group_name(self.group_name, hole, (cx, cy)),
+                {
+                    'type': 'positions_snapshot',
+                    'hole': hole,
+                    'positions': entries,
+                    **prebuild('positions', entries),
+                }
+            )
+        for party, entries in by_party.items():
+            await self.channel_layer.group_send(
+                party_group_name(self.group_name, party),
+                {
+                    'type': 'positions_snapshot',
+                    'hole': None,
+                    'positions': entries,
+                    **prebuild('positions', entries),
+                }
+            )
+
+    async def flush_summary(self, keyframe=False):
+        # Positions of everyone, for players outside each other's area.
+        # Consumers drop entries their client already has unless it's a keyframe.
+        by_hole = {}
+        for player_id, (username, qx, qy, cell) in self.grid.positions.items():
+            by_hole.setdefault(cell[0], []).append(
+                position_entry(username, player_id, qx, qy, self.quantum)
+            )
+        for hole, entries in by_hole.items():
+            await self.channel_layer.group_send(
+                self.group_name,
+                {
+                    'type': 'positions_summary',
+                    'hole': hole,
+                    'keyframe': keyframe,
+                    'positions': entries,
+                    **prebuild('summary', entries),
+                }
+            )
+
+    async def flush_putts(self):
+        putts = []
+        for player_id in list(self.putts)[:self.max_putts]:
+            putts.append(self.putts.pop(player_id))
+        results = await sync_to_async(simulate_putts, thread_sensitive=False)(
+            self.hole_id,
+            [(x, y, angle, power) for _, _, _, x, y, angle, power in putts],
+        )
+        for (username, player_id, hole, _, _, angle, power), result in zip(putts, results):
+            putt = {
+                'username': username,
+                'player_id': player_id,
+                'angle': angle,
+                'power': power,
+                'keyframes': result['keyframes'],
+                'final': result['final'],
+                'sunk': result['sunk'],
+            }
+            await self.channel_layer.group_send(
+                self.group_name,
+                {
+                    'type': 'player_putt',
+                    'hole': hole,
+                    **prebuild('putt', putt),
+                }
+            )
+
+
+# One ticker per hole group in this worker process
+_tickers = {}
+
+
+def acquire_ticker(group_name, channel_layer, hole_id):
+    ticker = _tickers.get(group_name)
+    if ticker is None:
+        ticker = HoleTicker(
+            group_name,
+            channel_layer,
+            getattr(settings, "GAME_TICK_RATE", 20),
+            hole_id,
+            getattr(settings, "GAME_MAX_PUTTS_PER_TICK", 16),
+            getattr(settings, "GAME_MAX_QUEUED_PUTTS", 256),
+        )
+        _tickers[group_name] = ticker
+    ticker.subscribers += 1
+    ticker.start()
+    return ticker
+
+
+def release_ticker(group_name):
+    ticker = _tickers.get(group_name)
+    if ticker is None:
+        return
+    ticker.subscribers -= 1
+    if ticker.subscribers <= 0:
+        ticker.stop()
+        del _tickers[group_name]
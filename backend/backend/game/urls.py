@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("stats/", views.all_hole_stats, name="all_hole_stats"),
+    path("<int:hole>/stats/", views.single_hole_stats, name="single_hole_stats"),
+]
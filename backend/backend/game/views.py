@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from .holestats import hole_stats
+
+
+@require_GET
+def all_hole_stats(request):
+    """GET /api/holes/stats/  per-hole mean, spread, histogram and difficulty rank"""
+    return JsonResponse({"holes": list(hole_stats().values())})
+
+
+@require_GET
+def single_hole_stats(request, hole):
+    """GET /api/holes/<hole>/stats/"""
+    # Difficulty ranks against the other holes, so read them all; it's O(holes)
+    stats = hole_stats().get(hole)
+    if stats is None:
+        return JsonResponse({"error": "No results for this hole"}, status=404)
+    return JsonResponse(stats)
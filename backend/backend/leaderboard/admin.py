@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import RoundResult, ScoreRollup
+
+@admin.register(RoundResult)
+class RoundResultAdmin(admin.ModelAdmin):
+    list_display = ("user", "shots", "holes", "played_at")
+    search_fields = ("user__username",)
+    date_hierarchy = "played_at"
+
+@admin.register(ScoreRollup)
+class ScoreRollupAdmin(admin.ModelAdmin):
+    list_display = ("user", "period", "bucket", "best_score", "rounds", "total_shots")
+    search_fields = ("user__username",)
+    list_filter = ("period", "bucket")
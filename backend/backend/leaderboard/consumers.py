@@ -1,12 +1,42 @@
 # leaderboard/consumers.py
+import asyncio
 import json
 
-from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from backend.core.auth import aresolve_token
+from .index import leaderboard_index
+
+
+def leaderboard_settings():
+    config = getattr(settings, "LEADERBOARD", {})
+    return config.get("TOP_N", 100), config.get("AROUND_WINDOW", 5)
+
+
+def diff_window(old, new):
+    """
+    Patch turning window ``old`` into ``new``: entries whose rank or score
+    changed (or that entered) go in ``upsert``, players that left in ``remove``.
+    """
+    before = {entry["player"]: entry for entry in old}
+    upsert = [entry for entry in new if before.get(entry["player"]) != entry]
+    current = {entry["player"] for entry in new}
+    remove = [player for player in before if player not in current]
+    return {"upsert": upsert, "remove": remove}
+
 
 class LeaderboardConsumer(AsyncWebsocketConsumer):
     async def connect(self):
+        from .publisher import leaderboard_publisher
         self.group_name = "leaderboard"
+        # Windows this socket subscribed to, and what it last sent for them
+        self.top_n = 0
+        self.around_player = None
+        self.around_window = 0
+        self.windows = {}
+        # Broadcasts for score changes are scheduled on this loop
+        leaderboard_publisher.attach(asyncio.get_event_loop())
         # Join leaderboard group
         await self.channel_layer.group_add(
             self.group_name,
@@ -23,9 +53,20 @@ class LeaderboardConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         data = json.loads(text_data)
+        if not isinstance(data, dict):
+            return
         message_type = data.get("type")
         if message_type == "request_leaderboard":
             await self.send_leaderboard_data()
+        elif message_type == "request_rank":
+            player = data.get("player", "")
+            # Names only; anything else would be used as an index key
+            if isinstance(player, str):
+                await self.send_rank(player)
+        elif message_type == "subscribe":
+            await self.subscribe(data)
+        elif message_type == "resync":
+            await self.send_snapshot()
 
     async def send_leaderboard_data(self):
         leaders = await get_leaderboard_data()
@@ -33,18 +74,70 @@ class LeaderboardConsumer(AsyncWebsocketConsumer):
             "type": "leaderboard",
             "leaders": leaders,
         }))
+
+    async def send_rank(self, player):
+        _, window = leaderboard_settings()
+        await leaderboard_index.ensure_loaded()
+        await self.send(text_data=json.dumps({
+            "type": "rank",
+            "player": player,
+            "rank": leaderboard_index.rank(player),
+            "around": leaderboard_index.around(player, window),
+        }))
+
+    async def subscribe(self, data):
+        top_n, default_window = leaderboard_settings()
+        try:
+            top, around = int(data.get("top", 0)), int(data.get("around", 0))
+        except (TypeError, ValueError):
+            return
+        # Windows are capped so every patch stays bounded
+        self.top_n = min(max(top, 0), top_n)
+        self.around_window = min(max(around, 0), default_window)
+        player = data.get("player")
+        self.around_player = player if isinstance(player, str) else None
+        if self.around_window and not self.around_player:
+            # "Around me" defaults to whoever the cookie belongs to
+            user = await aresolve_token(self.scope["cookies"].get("auth_token"))
+            self.around_player = user.username if user else None
+        await self.send_snapshot()
+
+    def current_windows(self):
+        windows = {}
+        if self.top_n:
+            windows["top"] = leaderboard_index.top(self.top_n)
+        if self.around_window and self.around_player:
+            windows["around"] = leaderboard_index.around(self.around_player, self.around_window)
+        return windows
+
+    async def send_snapshot(self):
+        await leaderboard_index.ensure_loaded()
+        self.windows = self.current_windows()
+        await self.send(text_data=json.dumps({
+            "type": "leaderboard_snapshot",
+            "rank": leaderboard_index.rank(self.around_player) if self.around_player else None,
+            "total": len(leaderboard_index),
+            **self.windows,
+        }))
+
+    # 📣 Handler: a best score changed; send subscribers only what moved in their windows
     async def leaderboard_update(self, event):
+        if not (self.top_n or self.around_window):
+            return
+        windows = self.current_windows()
+        patch = {name: diff_window(self.windows.get(name, []), entries) for name, entries in windows.items()}
+        self.windows = windows
+        patch = {name: ops for name, ops in patch.items() if ops["upsert"] or ops["remove"]}
+        if not patch:
+            return
         await self.send(text_data=json.dumps({
-            "type": "leaderboard",
-            "leaders": event["leaders"]
+            "type": "leaderboard_patch",
+            "rank": leaderboard_index.rank(self.around_player) if self.around_player else None,
+            "total": len(leaderboard_index),
+            **patch,
         }))
 
-@database_sync_to_async
-def get_leaderboard_data():
-    from backend.lobby.models import LobbyStatus
-    leaders = LobbyStatus.objects.filter(best_score__gt=0).order_by('best_score')
-    payload = [
-        {"player": entry.user.username, "score": entry.best_score}
-        for entry in leaders
-    ]
-    return payload
\ No newline at end of file
+async def get_leaderboard_data():
+    top_n, _ = leaderboard_settings()
+    await leaderboard_index.ensure_loaded()
+    return leaderboard_index.top(top_n)
@@ -0,0 +1,204 @@
+import threading
+from bisect import bisect_left, insort
+
+from channels.db import database_sync_to_async
+
+
+class SortedKeyList:
+    """
+    Sorted list stored as a list of short sorted chunks.
+
+    Inserts and removals bisect the chunk maxima, then the chunk, and only
+    shift elements inside that one chunk, so they stay cheap at hundreds
+    of thousands of keys where a single flat list would move half of it
+    on every change. Positions are found by summing the chunk lengths in
+    front, which is a few hundred additions at most.
+    """
+
+    def __init__(self, load=512):
+        self.load = load
+        self.chunks = []
+        self.maxes = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.chunks, self.maxes, self.size = [], [], 0
+
+    def extend_sorted(self, keys):
+        # Bulk load from keys that are already in order
+        for start in range(0, len(keys), self.load):
+            chunk = list(keys[start:start + self.load])
+            self.chunks.append(chunk)
+            self.maxes.append(chunk[-1])
+        self.size += len(keys)
+
+    def add(self, key):
+        if not self.chunks:
+            self.chunks.append([key])
+            self.maxes.append(key)
+        else:
+            i = min(bisect_left(self.maxes, key), len(self.chunks) - 1)
+            chunk = self.chunks[i]
+            insort(chunk, key)
+            self.maxes[i] = chunk[-1]
+            if len(chunk) > 2 * self.load:
+                self.chunks[i:i + 1] = [chunk[:self.load], chunk[self.load:]]
+                self.maxes[i:i + 1] = [chunk[self.load - 1], chunk[-1]]
+        self.size += 1
+
+    def remove(self, key):
+        i = bisect_left(self.maxes, key)
+        chunk = self.chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        if chunk:
+            self.maxes[i] = chunk[-1]
+        else:
+            del self.chunks[i]
+            del self.maxes[i]
+        self.size -= 1
+
+    def index(self, key):
+        i = bisect_left(self.maxes, key)
+        return sum(len(chunk) for chunk in self.chunks[:i]) + bisect_left(self.chunks[i], key)
+
+    def slice(self, start, stop):
+        start, stop = max(start, 0), min(stop, self.size)
+        result = []
+        for chunk in self.chunks:
+            if start >= stop:
+                break
+            if start < len(chunk):
+                taken = chunk[start:stop]
+                result.extend(taken)
+                stop -= start + len(taken)
+                start = 0
+            else:
+                start -= len(chunk)
+                stop -= len(chunk)
+        return result
+
+
+def load_best_scores():
+    from backend.lobby.models import LobbyStatus
+    return list(
+        LobbyStatus.objects.filter(best_score__gt=0).values_list('user__username', 'best_score')
+    )
+
+
+class LeaderboardIndex:
+    """
+    In-memory leaderboard: best scores kept sorted, lowest first.
+
+    Seeded once per process from the database, then updated in place
+    on every best-score change, so ``top``, ``rank`` and ``around`` never
+    query. Ties are broken by username to keep the order stable.
+    Scores committed while the seed query runs are queued and replayed
+    over its rows, whether or not the query already saw them.
+    """
+
+    def __init__(self):
+        self.scores = {}
+        self.order = SortedKeyList()
+        self.loaded = False
+        self.loading = False
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+
+    def seed(self, rows):
+        with self.lock:
+            self.scores = {username: score for username, score in rows if score > 0}
+            # Changes that landed while the rows were being read win
+            for username, score in self.pending.items():
+                if score > 0:
+                    self.scores[username] = score
+                else:
+                    self.scores.pop(username, None)
+            self.pending = {}
+            self.order.clear()
+            self.order.extend_sorted(sorted((score, username) for username, score in self.scores.items()))
+            self.loaded = True
+            self.loading = False
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await database_sync_to_async(self.ensure_loaded_sync)()
+
+    def ensure_loaded_sync(self):
+        if self.loaded:
+            return
+        with self.load_lock:
+            if self.loaded:
+                return
+            with self.lock:
+                self.loading = True
+                self.pending = {}
+            try:
+                rows = load_best_scores()
+            except Exception:
+                with self.lock:
+                    self.loading = False
+                    self.pending = {}
+                raise
+            self.seed(rows)
+
+    def update(self, username, score):
+        """Set a player's best score; returns False if nothing changed."""
+        with self.lock:
+            if self.loading:
+                self.pending[username] = score
+                return False
+            if not self.loaded:
+                # The seed query will read it from the table
+                return False
+            previous = self.scores.get(username)
+            if previous == score or (previous is None and score <= 0):
+                return False
+            if previous is not None:
+                self.order.remove((previous, username))
+                del self.scores[username]
+            if score > 0:
+                self.order.add((score, username))
+                self.scores[username] = score
+            return True
+
+    def remove(self, username):
+        return self.update(username, 0)
+
+    def __len__(self):
+        return len(self.order)
+
+    @staticmethod
+    def _entries(keys, first_rank):
+        return [
+            {"rank": first_rank + i, "player": username, "score": score}
+            for i, (score, username) in enumerate(keys)
+        ]
+
+    def top(self, k):
+        with self.lock:
+            return self._entries(self.order.slice(0, k), 1)
+
+    def rank(self, username):
+        """1-based position, or None if the player has no score."""
+        with self.lock:
+            score = self.scores.get(username)
+            if score is None:
+                return None
+            return self.order.index((score, username)) + 1
+
+    def around(self, username, window):
+        """The player plus up to ``window`` places either side of them."""
+        with self.lock:
+            score = self.scores.get(username)
+            if score is None:
+                return []
+            position = self.order.index((score, username))
+            start = max(position - window, 0)
+            return self._entries(self.order.slice(start, position + window + 1), start + 1)
+
+
+leaderboard_index = LeaderboardIndex()
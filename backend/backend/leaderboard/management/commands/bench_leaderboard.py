@@ -0,0 +1,68 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.leaderboard.index import LeaderboardIndex
+
+
+class Command(BaseCommand):
+    help = "Leaderboard index timings at a large player count, against re-sorting per read"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=100000)
+        parser.add_argument("--ops", type=int, default=10000, help="Operations per measurement")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        players, ops = options["players"], options["ops"]
+        rng = random.Random(options["seed"])
+
+        # Built in memory; the DB side of seeding is one query either way
+        rows = [(f"player{i}", rng.randint(30, 200)) for i in range(players)]
+        names = [username for username, _ in rows]
+
+        index = LeaderboardIndex()
+        started = time.perf_counter()
+        index.seed(rows)
+        self.stdout.write(f"seed {players} players: {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+        self.stdout.write(f"{ops} operations per row, microseconds per operation")
+        self.stdout.write(f"{'operation':<16}{'index':>10}{'re-sort':>12}")
+
+        scores = dict(rows)
+
+        def index_update():
+            username = rng.choice(names)
+            index.update(username, rng.randint(30, 200))
+
+        def naive_update():
+            scores[rng.choice(names)] = rng.randint(30, 200)
+
+        def naive_top():
+            return sorted((score, username) for username, score in scores.items())[:10]
+
+        def naive_rank():
+            username = rng.choice(names)
+            ordered = sorted((score, name) for name, score in scores.items())
+            return ordered.index((scores[username], username)) + 1
+
+        measurements = [
+            ("update", index_update, naive_update),
+            ("top(10)", lambda: index.top(10), naive_top),
+            ("rank", lambda: index.rank(rng.choice(names)), naive_rank),
+            ("around(5)", lambda: index.around(rng.choice(names), 5), naive_rank),
+        ]
+        # Re-sorting is slow enough that a few reads give a stable figure
+        naive_ops = max(ops // 1000, 3)
+        for label, fast, naive in measurements:
+            fast_us = self.time_per_op(fast, ops)
+            naive_us = self.time_per_op(naive, naive_ops if naive is not naive_update else ops)
+            self.stdout.write(f"{label:<16}{fast_us:>10.2f}{naive_us:>12.1f}")
+
+    @staticmethod
+    def time_per_op(fn, ops):
+        started = time.perf_counter()
+        for _ in range(ops):
+            fn()
+        return (time.perf_counter() - started) / ops * 1e6
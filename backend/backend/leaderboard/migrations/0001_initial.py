@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shots', models.PositiveIntegerField()),
+                ('holes', models.PositiveIntegerField()),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['played_at'], name='round_played_at_idx'), models.Index(fields=['user', 'played_at'], name='round_user_played_at_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('bucket', models.DateField()),
+                ('best_score', models.PositiveIntegerField()),
+                ('rounds', models.PositiveIntegerField(default=0)),
+                ('total_shots', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'bucket', 'best_score'], name='rollup_board_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket', 'user'), name='rollup_unique_player_bucket')],
+            },
+        ),
+    ]
@@ -1,3 +1,48 @@
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
 
-# Create your models here.
+
+class RoundResult(models.Model):
+    """One finished round, appended on every submission and never updated."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='round_results')
+    shots = models.PositiveIntegerField()
+    holes = models.PositiveIntegerField()
+    played_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['played_at'], name='round_played_at_idx'),
+            models.Index(fields=['user', 'played_at'], name='round_user_played_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.shots} shots over {self.holes} holes at {self.played_at:%Y-%m-%d %H:%M}"
+
+
+class ScoreRollup(models.Model):
+    """
+    A player's rounds within one day or week, kept up to date on submit
+    so period leaderboards are an indexed read of one bucket.
+    """
+    DAY = 'day'
+    WEEK = 'week'
+    PERIOD_CHOICES = [(DAY, 'Day'), (WEEK, 'Week')]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateField()  # the day, or the Monday the week starts on
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='score_rollups')
+    best_score = models.PositiveIntegerField()
+    rounds = models.PositiveIntegerField(default=0)
+    total_shots = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'bucket', 'user'], name='rollup_unique_player_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'bucket', 'best_score'], name='rollup_board_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.period} {self.bucket} - best {self.best_score}"
@@ -0,0 +1,80 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .index import leaderboard_index
+from .versions import bump_leaderboard_version
+
+
+class LeaderboardPublisher:
+    """
+    Coalesces leaderboard broadcasts off the request path.
+
+    Saves that change a best score only call ``mark``, from whatever
+    thread they run in. The first mark schedules a task on the event
+    loop the leaderboard sockets live on; it waits ``window`` seconds,
+    then sends one bare ``leaderboard_update`` to the ``leaderboard``
+    group, and each socket diffs its own windows against the index.
+    Every mark in that window rides on the same broadcast, and a mark
+    that lands while one is going out schedules one more. Until a
+    leaderboard socket has attached a loop (shell, management commands)
+    marks publish inline.
+    """
+
+    def __init__(self, window=0.25):
+        self.window = window
+        self.loop = None
+        self.dirty = False
+        self._task = None
+
+        # Counters
+        self.marked = 0
+        self.published = 0
+
+    def attach(self, loop):
+        self.loop = loop
+
+    def mark(self):
+        self.marked += 1
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            async_to_sync(self.send)()
+            return
+        loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self):
+        self.dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        while self.dirty:
+            await asyncio.sleep(self.window)
+            self.dirty = False
+            await self.send()
+
+    async def send(self):
+        try:
+            # Subscribers read their own windows from the index
+            await get_channel_layer().group_send(
+                "leaderboard",
+                {"type": "leaderboard_update"}
+            )
+        except Exception as e:
+            print(f"[Leaderboard] Failed to publish leaderboard: {e}")
+            return
+        self.published += 1
+
+
+leaderboard_publisher = LeaderboardPublisher(
+    getattr(settings, "LEADERBOARD", {}).get("PUBLISH_WINDOW", 0.25)
+)
+
+
+def record_best_score(username, score):
+    """Everything that follows a best-score change; a score of 0 drops the player."""
+    leaderboard_index.update(username, score)
+    bump_leaderboard_version()
+    leaderboard_publisher.mark()
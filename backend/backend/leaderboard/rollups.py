@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .models import ScoreRollup
+
+
+def bucket_for(period, day):
+    # Weeks are keyed by their Monday
+    return day if period == ScoreRollup.DAY else day - timedelta(days=day.weekday())
+
+
+def buckets_for(moment):
+    """{period: bucket} for the day and week ``moment`` falls in, in local time."""
+    day = timezone.localdate(moment)
+    return {period: bucket_for(period, day) for period in (ScoreRollup.DAY, ScoreRollup.WEEK)}
+
+
+def add_to_rollups(user_id, rounds, total_shots, best, moment):
+    """Fold a player's rounds into the day and week rollups they were played in."""
+    changes = {
+        "rounds": F("rounds") + rounds,
+        "total_shots": F("total_shots") + total_shots,
+        "best_score": Least("best_score", Value(best)),
+    }
+    for period, bucket in buckets_for(moment).items():
+        rows = ScoreRollup.objects.filter(period=period, bucket=bucket, user_id=user_id)
+        if rows.update(**changes):
+            continue
+        try:
+            # First round in this bucket; a concurrent submit may get there first
+            with transaction.atomic():
+                ScoreRollup.objects.create(
+                    period=period, bucket=bucket, user_id=user_id,
+                    best_score=best, rounds=rounds, total_shots=total_shots
+                )
+        except IntegrityError:
+            rows.update(**changes)
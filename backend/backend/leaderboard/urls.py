@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("snapshot/", views.leaderboard_snapshot, name="leaderboard_snapshot"),
+    path("period/<str:period>/", views.leaderboard_period, name="leaderboard_period"),
+    path("top/", views.leaderboard_top, name="leaderboard_top"),
+    path("rank/<str:username>/", views.leaderboard_rank, name="leaderboard_rank"),
+]
@@ -0,0 +1,12 @@
+from backend.lobby.versions import bump_version, get_version
+
+# Bumped whenever a best score changes; the HTTP snapshot is keyed by it
+LEADERBOARD_VERSION_KEY = "leaderboard:version"
+
+
+def leaderboard_version():
+    return get_version(LEADERBOARD_VERSION_KEY)
+
+
+def bump_leaderboard_version():
+    return bump_version(LEADERBOARD_VERSION_KEY)
@@ -1,3 +1,128 @@
-from django.shortcuts import render
+import json
+from datetime import date
 
-# Create your views here.
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
+
+from .consumers import leaderboard_settings
+from .index import leaderboard_index
+from .models import ScoreRollup
+from .rollups import bucket_for
+from .versions import leaderboard_version
+
+MAX_TOP = 1000
+MAX_WINDOW = 100
+
+
+def _int_param(request, name, default, maximum):
+    value = int(request.GET.get(name, default))
+    if value < 1:
+        raise ValueError(name)
+    return min(value, maximum)
+
+
+@require_GET
+def leaderboard_top(request):
+    """GET /api/leaderboard/top/?k=  best (lowest) scores first"""
+    top_n, _ = leaderboard_settings()
+    try:
+        k = _int_param(request, "k", top_n, MAX_TOP)
+    except ValueError:
+        return JsonResponse({"error": "k must be a positive integer"}, status=400)
+    leaderboard_index.ensure_loaded_sync()
+    return JsonResponse({"leaders": leaderboard_index.top(k), "total": len(leaderboard_index)})
+
+
+@require_GET
+def leaderboard_rank(request, username):
+    """GET /api/leaderboard/rank/<username>/?window=  rank plus the places around it"""
+    _, default_window = leaderboard_settings()
+    try:
+        window = _int_param(request, "window", default_window, MAX_WINDOW)
+    except ValueError:
+        return JsonResponse({"error": "window must be a positive integer"}, status=400)
+    leaderboard_index.ensure_loaded_sync()
+    rank = leaderboard_index.rank(username)
+    if rank is None:
+        return JsonResponse({"error": "Player has no score"}, status=404)
+    return JsonResponse({
+        "player": username,
+        "rank": rank,
+        "total": len(leaderboard_index),
+        "around": leaderboard_index.around(username, window),
+    })
+
+
+def build_snapshot(version):
+    top_n, _ = leaderboard_settings()
+    leaderboard_index.ensure_loaded_sync()
+    return json.dumps({
+        "version": version,
+        "total": len(leaderboard_index),
+        "leaders": leaderboard_index.top(top_n),
+    })
+
+
+@require_GET
+def leaderboard_snapshot(request):
+    """
+    GET /api/leaderboard/snapshot/
+
+    The top of the board, built once per leaderboard version and shared
+    through the cache. The ETag is the version, so caches revalidate with
+    a 304 until a best score changes.
+    """
+    version = leaderboard_version()
+    etag = f'"leaderboard-{version}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        key = f"leaderboard:snapshot:{version}"
+        body = cache.get(key)
+        if body is None:
+            body = build_snapshot(version)
+            cache.set(key, body, timeout=300)
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = etag
+    # Shared caches may serve it for a few seconds, then revalidate
+    max_age = getattr(settings, "LEADERBOARD", {}).get("SNAPSHOT_MAX_AGE", 5)
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+@require_GET
+def leaderboard_period(request, period):
+    """
+    GET /api/leaderboard/period/<day|week|all>/?date=YYYY-MM-DD&k=
+
+    Day and week boards read one rollup bucket through its index; ``date``
+    picks the bucket it falls in (default today). "all" is the all-time
+    board from the in-memory index.
+    """
+    top_n, _ = leaderboard_settings()
+    try:
+        k = _int_param(request, "k", top_n, MAX_TOP)
+        day = date.fromisoformat(request.GET["date"]) if "date" in request.GET else timezone.localdate()
+    except ValueError:
+        return JsonResponse({"error": "Invalid query parameters"}, status=400)
+
+    if period == "all":
+        leaderboard_index.ensure_loaded_sync()
+        return JsonResponse({"period": period, "bucket": None, "leaders": leaderboard_index.top(k)})
+    if period not in (ScoreRollup.DAY, ScoreRollup.WEEK):
+        return JsonResponse({"error": "period must be day, week or all"}, status=404)
+
+    bucket = bucket_for(period, day)
+    rows = ScoreRollup.objects.filter(period=period, bucket=bucket).order_by(
+        'best_score', 'user__username'
+    ).values_list('user__username', 'best_score', 'rounds')[:k]
+    leaders = [
+        {"rank": rank, "player": username, "score": best_score, "rounds": rounds}
+        for rank, (username, best_score, rounds) in enumerate(rows, start=1)
+    ]
+    return JsonResponse({"period": period, "bucket": bucket.isoformat(), "leaders": leaders})
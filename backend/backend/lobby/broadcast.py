@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+from django.conf import settings
+
+
+def broadcast_settings():
+    config = getattr(settings, "LOBBY_BROADCAST", {})
+    return config.get("WINDOW", 0.05), config.get("MAX_DELAY", 0.25)
+
+
+def merge_change(previous, delta, player):
+    """Fold a new delta for one player into the one already waiting."""
+    if previous is None:
+        return delta, dict(player)
+    before, fields = previous
+    if delta == "player_updated":
+        if before == "player_left":
+            return previous
+        return before, {**fields, **player}
+    # A join or leave supersedes whatever was waiting
+    return delta, dict(player)
+
+
+class CoalescingBroadcaster:
+    """
+    Merges lobby deltas for one group into a single broadcast.
+
+    Changes are keyed by username, so a burst of colour changes or ready
+    toggles from one player collapses into one entry. The flush waits
+    until no change has arrived for ``window`` seconds, but never more
+    than ``max_delay`` seconds after the first pending change, so a
+    steady stream of events can't hold the broadcast back forever.
+    """
+
+    def __init__(self, group_name, channel_layer, window, max_delay):
+        self.group_name = group_name
+        self.channel_layer = channel_layer
+        self.window = window
+        self.max_delay = max_delay
+        self.pending = {}
+        self.first_at = None
+        self.last_at = None
+        self._task = None
+
+        # Counters
+        self.events = 0
+        self.flushes = 0
+
+    def publish(self, delta, player):
+        now = asyncio.get_event_loop().time()
+        username = player["username"]
+        self.pending[username] = merge_change(self.pending.get(username), delta, player)
+        if self.first_at is None:
+            self.first_at = now
+        self.last_at = now
+        self.events += 1
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            deadline = min(self.last_at + self.window, self.first_at + self.max_delay)
+            wait = deadline - loop.time()
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        await self.flush()
+
+    async def flush(self):
+        changes = [
+            {'type': delta, 'player': player}
+            for delta, player in self.pending.values()
+        ]
+        self.pending = {}
+        self.first_at = self.last_at = None
+        self._task = None
+        if not changes:
+            return
+        self.flushes += 1
+        await self.channel_layer.group_send(
+            self.group_name,
+            {
+                'type': 'lobby_update',
+                'changes': changes,
+                'text': json.dumps({'type': 'lobby_update', 'changes': changes}),
+            }
+        )
+
+
+_broadcasters = {}
+
+
+def get_broadcaster(group_name, channel_layer):
+    broadcaster = _broadcasters.get(group_name)
+    if broadcaster is None:
+        window, max_delay = broadcast_settings()
+        broadcaster = CoalescingBroadcaster(group_name, channel_layer, window, max_delay)
+        _broadcasters[group_name] = broadcaster
+    broadcaster.channel_layer = channel_layer
+    return broadcaster
+
+
+def release_broadcaster(group_name):
+    # Anything still pending is flushed by the task that owns it
+    _broadcasters.pop(group_name, None)
@@ -1,134 +1,170 @@
+import asyncio
 import json
-import hashlib
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
-@database_sync_to_async
-def get_username(auth_token):
-    from backend.core.models import AuthToken
-    user = AuthToken.objects.get(token_hash=auth_token)
-    return user.user.username
-
-@database_sync_to_async
-def get_or_create_lobby_status(username):
-    from django.contrib.auth.models import User
-    from .models import LobbyStatus
-    user = User.objects.get(username=username)
-    lobby_status, _ = LobbyStatus.objects.get_or_create(user=user)
-    return lobby_status
+from backend.core.auth import aresolve_token
+from .broadcast import get_broadcaster
+from .matchmaking import get_matchmaker
+from .presence import ensure_reaper, get_lobby_presence, presence_settings
+from .state import player_entry
+from .versions import bump_players_version
+from .writebehind import connected_flags
 
 @database_sync_to_async
-def update_color(username, new_color):
-    from django.contrib.auth.models import User
+def join_lobby(user_id, username):
     from .models import LobbyStatus
-    user = User.objects.get(username=username)
-    lobby_status, _ = LobbyStatus.objects.get_or_create(user=user)
-    lobby_status.color = new_color
-    lobby_status.save()
+    lobby_status, _ = LobbyStatus.objects.get_or_create(user_id=user_id)
+    return player_entry(lobby_status, username)
 
 @database_sync_to_async
-def toggle_ready(username):
-    from django.contrib.auth.models import User
+def update_color(user_id, new_color):
+    from django.utils.timezone import now
     from .models import LobbyStatus
-    user = User.objects.get(username=username)
-    lobby_status, _ = LobbyStatus.objects.get_or_create(user=user)
-    lobby_status.is_ready = not lobby_status.is_ready
-    lobby_status.save()
-    return lobby_status.is_ready
+    # Only touches the row if the colour actually changes
+    changed = LobbyStatus.objects.filter(user_id=user_id).exclude(color=new_color).update(
+        color=new_color, last_updated=now()
+    ) > 0
+    if changed:
+        bump_players_version()
+    return changed
 
 @database_sync_to_async
-def mark_user_connected(username, connected=True):
-    from django.contrib.auth.models import User
+def toggle_ready(user_id):
+    from django.db import connection
+    from django.utils.timezone import now
     from .models import LobbyStatus
-    user = User.objects.get(username=username)
-    lobby_status, _ = LobbyStatus.objects.get_or_create(user=user)
-    lobby_status.connected = connected
-    lobby_status.save()
-
-@database_sync_to_async
-def get_all_players():
-    from .models import LobbyStatus
-    players = LobbyStatus.objects.filter(connected=True)
-    return [
-        {
-            "username": p.user.username,
-            "color": p.color,
-            "is_ready": p.is_ready,
-            "hole": p.current_hole,
-            "score": p.score,
-            "best_score": p.best_score,
-        }
-        for p in players
-    ]
+    # Flipped in one statement so two quick toggles can't both read the old value
+    table = connection.ops.quote_name(LobbyStatus._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET is_ready = NOT is_ready, last_updated = %s "
+            f"WHERE user_id = %s RETURNING is_ready",
+            [now(), user_id],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    bump_players_version()
+    return bool(row[0])
 
 class LobbyConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
-        self.room_group_name = "lobby_group"
-
-        auth_token = hashlib.sha256(
-            self.scope["cookies"].get("auth_token").encode()
-        ).hexdigest()
-        self.username = await get_username(auth_token)
-
-        await get_or_create_lobby_status(self.username)
-        await mark_user_connected(self.username, True)
-
+        user = await aresolve_token(self.scope["cookies"].get("auth_token"))
+        if user is None:
+            await self.close()
+            return
+        self.username = user.username
+        self.user_id = user.user_id
+
+        player = await join_lobby(self.user_id, self.username)
+
+        # 💓 Online only while we keep beating; the reaper clears lapsed players
+        self.presence = get_lobby_presence()
+        self.ttl, self.heartbeat_interval, _ = presence_settings()
+        await self.presence.beat(self.user_id, self.ttl)
+        connected_flags.mark(self.user_id, True)
+        self.heartbeat_task = asyncio.ensure_future(self.heartbeat())
+        ensure_reaper(self.channel_layer)
+
+        # 🏠 Placed in a room with space; only its members hear our changes
+        self.matchmaker = get_matchmaker()
+        self.room = self.matchmaker.join(player, self.user_id, self.channel_name)
+        self.room_group_name = self.room.group_name
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
         await self.accept()
 
-        await self.broadcast_lobby_state()
-        print(f"[WebSocket] Connected: {self.username}")
+        await self.broadcast_delta('player_joined', player)
+        print(f"[WebSocket] Connected: {self.username} (room {self.room.room_id})")
         await self.send(text_data=json.dumps({
             'type': 'username',
             'username': self.username
         }))
+        await self.send(text_data=json.dumps({
+            'type': 'room',
+            'room': self.room.room_id,
+            'capacity': self.room.capacity,
+        }))
+
+        # Still ready from last time: back in the queue
+        if player['is_ready']:
+            await self.queue_ready(True)
 
     async def disconnect(self, close_code):
-        await mark_user_connected(self.username, False)
+        # Connection was refused before joining the lobby
+        if not hasattr(self, 'room'):
+            return
+        self.heartbeat_task.cancel()
+        await self.presence.leave(self.user_id)
+        connected_flags.mark(self.user_id, False)
+        if self.matchmaker.leave(self.username, self.channel_name) is not None:
+            await self.broadcast_delta('player_left', {'username': self.username})
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
-        await self.broadcast_lobby_state()
 
     async def receive(self, text_data):
         data = json.loads(text_data)
         message_type = data.get('type')
 
         if message_type == 'set_color':
-            await update_color(self.username, data.get("color"))
-            await self.broadcast_lobby_state()
+            color = data.get("color")
+            if isinstance(color, str) and await update_color(self.user_id, color[:20]):
+                await self.broadcast_delta('player_updated', {'username': self.username, 'color': color[:20]})
 
         elif message_type == 'toggle_ready':
-            await toggle_ready(self.username)
-            await self.broadcast_lobby_state()
+            is_ready = await toggle_ready(self.user_id)
+            if is_ready is not None:
+                await self.broadcast_delta('player_updated', {'username': self.username, 'is_ready': is_ready})
+                await self.queue_ready(is_ready)
 
         elif message_type == 'request_players':
             await self.send_lobby_state()
 
+    async def heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if await self.presence.beat(self.user_id, self.ttl):
+                # Our entry had gone (another tab left, or we lapsed): flag us online again
+                connected_flags.mark(self.user_id, True)
+
+    async def queue_ready(self, is_ready):
+        # 🎯 Ready players wait in the matchmaking queue for a game session
+        self.matchmaker.set_ready(self.username, is_ready, self.channel_layer)
+        if is_ready:
+            await self.matchmaker.match(self.channel_layer)
+
     async def send_lobby_state(self):
-        players = await get_all_players()
+        # 📋 Full list only on request, straight from the room
         await self.send(text_data=json.dumps({
             'type': 'players_list',
-            'players': players
+            'players': self.room.snapshot()
         }))
 
-    async def broadcast_lobby_state(self):
-        players = await get_all_players()
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'send_players_list',
-                'players': players
-            }
-        )
+    async def broadcast_delta(self, delta, player):
+        # 📣 Only what changed, merged with other changes in a short window
+        if delta == 'player_updated':
+            self.room.update(player['username'], player)
+        get_broadcaster(self.room_group_name, self.channel_layer).publish(delta, player)
+
+    # 🧩 Handler: batched joined / updated / left changes
+    async def lobby_update(self, event):
+        await self.send(text_data=event['text'])
 
-    async def send_players_list(self, event):
+    # 🧩 Handler: the reaper gave up on us; the client reconnects fresh
+    async def presence_expired(self, event):
+        await self.close()
+
+    # 🧩 Handler: matched into a game session
+    async def session_start(self, event):
         await self.send(text_data=json.dumps({
-            'type': 'players_list',
-            'players': event['players']
+            'type': 'game_session',
+            'session': event['session'],
+            'hole': event['hole'],
+            'players': event['players'],
         }))
@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import secrets
+import time
+from collections import OrderedDict
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .broadcast import get_broadcaster, release_broadcaster
+from .state import LobbyRoom
+from .versions import bump_players_version
+
+
+@database_sync_to_async
+def clear_ready(user_ids):
+    from django.utils.timezone import now
+    from .models import LobbyStatus
+    if LobbyStatus.objects.filter(user_id__in=user_ids, is_ready=True).update(is_ready=False, last_updated=now()):
+        bump_players_version()
+
+
+class Matchmaker:
+    """
+    Splits the lobby into rooms and ready players into game sessions.
+
+    New players fill the oldest room that still has space; a new room is
+    opened when they're all full, and a room is dropped once its last
+    player leaves. Each room has its own channel group, so lobby traffic
+    grows with the room size rather than with everyone online.
+
+    Readying up puts a player in one FIFO matchmaking queue shared by all
+    rooms. As soon as ``session_size`` players are queued they're sent
+    into a new game session together; a smaller group of at least
+    ``min_players`` goes once its oldest player has waited ``max_wait``
+    seconds.
+
+    Rooms and the queue live in this process, like the game tickers, so
+    players are only matched with others connected to the same worker.
+    """
+
+    def __init__(self, capacity=8, session_size=4, min_players=2, max_wait=10.0, interval=1.0):
+        self.capacity = capacity
+        self.session_size = session_size
+        self.min_players = min_players
+        self.max_wait = max_wait
+        self.interval = interval
+
+        self.rooms = {}
+        self.room_of = {}
+        self.queue = OrderedDict()
+        self._room_ids = itertools.count(1)
+        self._task = None
+
+        # Counters
+        self.sessions_started = 0
+
+    def join(self, player, user_id, channel_name):
+        username = player["username"]
+        room = self.room_of.get(username)
+        if room is None:
+            # Oldest room with space first, so rooms fill up before new ones open
+            room = next((r for r in self.rooms.values() if not r.is_full), None)
+        if room is None:
+            room = LobbyRoom(next(self._room_ids), self.capacity)
+            self.rooms[room.room_id] = room
+        # A second tab for the same player takes the membership over
+        room.add(player, user_id, channel_name)
+        self.room_of[username] = room
+        return room
+
+    def leave(self, username, channel_name):
+        room = self.room_of.get(username)
+        if room is None or room.channels.get(username) != channel_name:
+            return None
+        room.remove(username)
+        del self.room_of[username]
+        self.queue.pop(username, None)
+        if not room.players:
+            del self.rooms[room.room_id]
+            release_broadcaster(room.group_name)
+        return room
+
+    def evict(self, user_id):
+        # Drop a player whose presence lapsed; returns (room, username, channel)
+        for username, room in self.room_of.items():
+            if room.user_ids.get(username) == user_id:
+                channel_name = room.channels[username]
+                self.leave(username, channel_name)
+                return room, username, channel_name
+        return None
+
+    def set_ready(self, username, ready, channel_layer):
+        if not ready:
+            self.queue.pop(username, None)
+            return
+        if username in self.room_of:
+            self.queue.setdefault(username, time.monotonic())
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run(channel_layer))
+
+    def take_batches(self, now):
+        batches = []
+        while len(self.queue) >= self.session_size:
+            batches.append([self.queue.popitem(last=False)[0] for _ in range(self.session_size)])
+        if len(self.queue) >= self.min_players:
+            oldest = next(iter(self.queue.values()))
+            if now - oldest >= self.max_wait:
+                batches.append(list(self.queue))
+                self.queue.clear()
+        return batches
+
+    async def match(self, channel_layer):
+        for usernames in self.take_batches(time.monotonic()):
+            await self.start_session(usernames, channel_layer)
+
+    async def start_session(self, usernames, channel_layer):
+        session = secrets.token_hex(4)
+        members = [(name, self.room_of[name]) for name in usernames if name in self.room_of]
+        await clear_ready([room.user_ids[name] for name, room in members])
+
+        for name, room in members:
+            channel_name = room.channels.get(name)
+            if channel_name is None:
+                # Left while the ready flags were being cleared
+                continue
+            room.update(name, {'is_ready': False})
+            get_broadcaster(room.group_name, channel_layer).publish(
+                'player_updated', {'username': name, 'is_ready': False}
+            )
+            await channel_layer.send(channel_name, {
+                'type': 'session_start',
+                'session': session,
+                'hole': 1,
+                'players': usernames,
+            })
+        self.sessions_started += 1
+        print(f"[Lobby] Session {session} started for {', '.join(usernames)}")
+
+    async def run(self, channel_layer):
+        # Picks up smaller groups once they've waited long enough;
+        # full batches are matched straight away by the consumer
+        while self.queue:
+            await asyncio.sleep(self.interval)
+            await self.match(channel_layer)
+
+
+_matchmaker = None
+
+
+def get_matchmaker():
+    """Build the matchmaker from ``settings.LOBBY_MATCHMAKING`` once per process."""
+    global _matchmaker
+    if _matchmaker is None:
+        config = getattr(settings, "LOBBY_MATCHMAKING", {})
+        _matchmaker = Matchmaker(
+            capacity=config.get("ROOM_CAPACITY", 8),
+            session_size=config.get("SESSION_SIZE", 4),
+            min_players=config.get("MIN_PLAYERS", 2),
+            max_wait=config.get("MAX_WAIT", 10.0),
+            interval=config.get("INTERVAL", 1.0),
+        )
+    return _matchmaker
+
+
+@receiver(setting_changed)
+def reset_matchmaker(setting, **kwargs):
+    # Lets benchmarks and tests change room sizes with override_settings
+    global _matchmaker
+    if setting == "LOBBY_MATCHMAKING":
+        _matchmaker = None
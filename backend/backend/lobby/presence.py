@@ -0,0 +1,218 @@
+import asyncio
+import time
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .versions import bump_players_version
+
+
+def presence_settings():
+    config = getattr(settings, "LOBBY_PRESENCE", {})
+    return config.get("TTL", 30), config.get("HEARTBEAT", 10), config.get("REAP_EVERY", 10)
+
+
+class BaseLobbyPresence:
+    """
+    Heartbeat-based record of which lobby users are online.
+
+    Every lobby consumer refreshes its user's entry well inside ``ttl``
+    seconds. If a worker dies, its consumers stop beating and their
+    entries lapse, which the reaper picks up.
+    """
+
+    async def beat(self, user_id, ttl):
+        """Refresh a user's entry; True if they weren't online before."""
+        raise NotImplementedError
+
+    async def leave(self, user_id):
+        raise NotImplementedError
+
+    async def expire(self, now=None):
+        """Drop and return every user whose entry has lapsed."""
+        raise NotImplementedError
+
+    async def alive(self, now=None):
+        raise NotImplementedError
+
+
+class InMemoryLobbyPresence(BaseLobbyPresence):
+    """
+    Presence held in this process only.
+
+    Fine for a single worker and for tests; with several workers each
+    would think the others' players are gone.
+    """
+
+    def __init__(self, **config):
+        self.expires = {}
+
+    async def beat(self, user_id, ttl):
+        now = time.time()
+        was_alive = self.expires.get(user_id, 0) > now
+        self.expires[user_id] = now + ttl
+        return not was_alive
+
+    async def leave(self, user_id):
+        self.expires.pop(user_id, None)
+
+    async def expire(self, now=None):
+        now = time.time() if now is None else now
+        lapsed = [user_id for user_id, expires in self.expires.items() if expires <= now]
+        for user_id in lapsed:
+            del self.expires[user_id]
+        return lapsed
+
+    async def alive(self, now=None):
+        now = time.time() if now is None else now
+        return {user_id for user_id, expires in self.expires.items() if expires > now}
+
+
+# Pops every lapsed entry in one step so two reapers never both get it
+EXPIRE_SCRIPT = """
+local lapsed = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if #lapsed > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+end
+return lapsed
+"""
+
+
+class RedisLobbyPresence(BaseLobbyPresence):
+    """
+    Presence shared by every worker through Redis.
+
+    One sorted set of ``user_id`` scored by the time the entry lapses.
+    """
+
+    def __init__(self, host="redis", port=6379, db=0, key="lobby:presence"):
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.Redis(host=host, port=port, db=db)
+        self.key = key
+        self._expire = self.client.register_script(EXPIRE_SCRIPT)
+
+    async def beat(self, user_id, ttl):
+        now = time.time()
+        score = await self.client.zscore(self.key, user_id)
+        await self.client.zadd(self.key, {user_id: now + ttl})
+        return score is None or score <= now
+
+    async def leave(self, user_id):
+        await self.client.zrem(self.key, user_id)
+
+    async def expire(self, now=None):
+        now = time.time() if now is None else now
+        return [int(user_id) for user_id in await self._expire(keys=[self.key], args=[now])]
+
+    async def alive(self, now=None):
+        now = time.time() if now is None else now
+        return {int(user_id) for user_id in await self.client.zrangebyscore(self.key, f"({now}", "+inf")}
+
+
+@database_sync_to_async
+def mark_disconnected(alive):
+    from .models import LobbyStatus
+    # Anyone still flagged connected without a live heartbeat, including
+    # players left behind by a worker that died
+    cleared = LobbyStatus.objects.filter(connected=True).exclude(user_id__in=alive).update(connected=False)
+    if cleared:
+        bump_players_version()
+    return cleared
+
+
+class PresenceReaper:
+    """
+    Background sweep that expires lapsed lobby presence in bulk.
+
+    Every ``interval`` seconds it pops the lapsed entries, clears
+    ``connected`` for everyone without a live heartbeat in a single
+    ``UPDATE``, and drops any lapsed players still held in this
+    process's lobby rooms. Their ``player_left`` deltas go through the
+    rooms' coalescing broadcasters, so a whole batch of expiries reaches
+    each room as one ``lobby_update``.
+    """
+
+    def __init__(self, presence, interval):
+        self.presence = presence
+        self.interval = interval
+        self._task = None
+
+        # Counters
+        self.reaped = 0
+
+    def start(self, channel_layer):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run(channel_layer))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self, channel_layer):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap(channel_layer)
+            except Exception as e:
+                print(f"[Lobby] Presence reaper failed: {e}")
+
+    async def reap(self, channel_layer):
+        from .broadcast import get_broadcaster
+        from .matchmaking import get_matchmaker
+
+        lapsed = await self.presence.expire()
+        cleared = await mark_disconnected(await self.presence.alive())
+
+        matchmaker = get_matchmaker()
+        for user_id in lapsed:
+            evicted = matchmaker.evict(user_id)
+            if evicted is None:
+                continue
+            room, username, channel_name = evicted
+            get_broadcaster(room.group_name, channel_layer).publish('player_left', {'username': username})
+            # If the consumer is somehow still there, make the client reconnect
+            await channel_layer.send(channel_name, {'type': 'presence_expired'})
+
+        self.reaped += len(lapsed)
+        if lapsed or cleared:
+            print(f"[Lobby] Reaped {len(lapsed)} lapsed heartbeats, cleared {cleared} connected flags")
+
+
+_presence = None
+_reaper = None
+
+
+def get_lobby_presence():
+    """Build the backend configured in ``settings.LOBBY_PRESENCE`` once per process."""
+    global _presence
+    if _presence is None:
+        config = getattr(settings, "LOBBY_PRESENCE", {})
+        backend = import_string(
+            config.get("BACKEND", "backend.lobby.presence.InMemoryLobbyPresence")
+        )
+        _presence = backend(**config.get("CONFIG", {}))
+    return _presence
+
+
+def ensure_reaper(channel_layer):
+    global _reaper
+    if _reaper is None:
+        _reaper = PresenceReaper(get_lobby_presence(), presence_settings()[2])
+    _reaper.start(channel_layer)
+    return _reaper
+
+
+@receiver(setting_changed)
+def reset_lobby_presence(setting, **kwargs):
+    # Lets benchmarks and tests swap backends with override_settings
+    global _presence, _reaper
+    if setting == "LOBBY_PRESENCE":
+        if _reaper is not None:
+            _reaper.stop()
+        _presence = None
+        _reaper = None
@@ -1,23 +1,33 @@
-
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from backend.leaderboard.consumers import get_leaderboard_data  # Your async leaderboard fetcher
+from backend.leaderboard.publisher import record_best_score
 from .models import LobbyStatus
+from .versions import bump_players_version
 
 @receiver(post_save, sender=LobbyStatus)
-def leaderboard_update_signal(sender, instance, **kwargs):
-    print(f"[DEBUG] leaderboard_update_signal fired for user={instance.user.username} best_score={instance.best_score}")
-    # Only trigger if there's a valid best_score (e.g., not 0)
+@receiver(post_delete, sender=LobbyStatus)
+def lobby_version_signal(sender, **kwargs):
+    # Saves and deletes; bulk UPDATEs bump the version themselves
+    bump_players_version()
+
+@receiver(post_init, sender=LobbyStatus)
+def remember_best_score(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred best_score doesn't cost a query
+    instance._saved_best_score = instance.__dict__.get('best_score')
+
+@receiver(post_save, sender=LobbyStatus)
+def leaderboard_update_signal(sender, instance, created=False, update_fields=None, **kwargs):
+    # Colors, ready toggles and connect flips leave the board alone
+    if update_fields is not None and 'best_score' not in update_fields:
+        return
+    # A new row remembers its constructor value, but the board has never seen it
+    previous = 0 if created else getattr(instance, '_saved_best_score', None)
+    instance._saved_best_score = instance.best_score
+    if instance.best_score == previous:
+        return
+    record_best_score(instance.user.username, instance.best_score)
+
+@receiver(post_delete, sender=LobbyStatus)
+def leaderboard_remove_signal(sender, instance, **kwargs):
     if instance.best_score > 0:
-        channel_layer = get_channel_layer()
-        leaderboard_data = async_to_sync(get_leaderboard_data)()
-        # Call the async leaderboard fetcher to get the updated data
-        async_to_sync(channel_layer.group_send)(
-            "leaderboard",
-            {
-                "type": "leaderboard_update",  # Custom event
-                "leaders": leaderboard_data  # Get leaderboard data asynchronously
-            }
-        )
\ No newline at end of file
+        record_best_score(instance.user.username, 0)
@@ -0,0 +1,50 @@
+def player_entry(status, username=None):
+    return {
+        "username": username or status.user.username,
+        "color": status.color,
+        "is_ready": status.is_ready,
+        "hole": status.current_hole,
+        "score": status.score,
+        "best_score": status.best_score,
+    }
+
+
+class LobbyRoom:
+    """
+    One lobby room: at most ``capacity`` players sharing a channel group.
+
+    ``players`` is the room's player list, kept current as members
+    join, leave and change, so ``request_players`` never touches the
+    database. ``channels`` maps each member to the consumer that owns
+    them, which is where a matched game session gets announced.
+    """
+
+    def __init__(self, room_id, capacity):
+        self.room_id = room_id
+        self.group_name = f"lobby_room_{room_id}"
+        self.capacity = capacity
+        self.players = {}
+        self.channels = {}
+        self.user_ids = {}
+
+    @property
+    def is_full(self):
+        return len(self.players) >= self.capacity
+
+    def add(self, player, user_id, channel_name):
+        username = player["username"]
+        self.players[username] = dict(player)
+        self.channels[username] = channel_name
+        self.user_ids[username] = user_id
+
+    def remove(self, username):
+        self.players.pop(username, None)
+        self.channels.pop(username, None)
+        self.user_ids.pop(username, None)
+
+    def update(self, username, fields):
+        if username in self.players:
+            self.players[username].update(fields)
+
+    def snapshot(self):
+        return list(self.players.values())
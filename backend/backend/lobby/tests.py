@@ -1,3 +1,70 @@
-from django.test import TestCase
+from collections import OrderedDict
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .broadcast import merge_change
+from .matchmaking import Matchmaker
+
+
+class MergeChangeTests(SimpleTestCase):
+    def test_first_change_is_kept_as_is(self):
+        player = {'username': 'ana', 'color': 'red'}
+        delta, fields = merge_change(None, 'player_updated', player)
+        self.assertEqual((delta, fields), ('player_updated', player))
+        self.assertIsNot(fields, player)
+
+    def test_updates_merge_into_the_waiting_one(self):
+        previous = ('player_updated', {'username': 'ana', 'color': 'red'})
+        merged = merge_change(previous, 'player_updated', {'username': 'ana', 'is_ready': True})
+        self.assertEqual(merged, ('player_updated', {'username': 'ana', 'color': 'red', 'is_ready': True}))
+
+    def test_update_after_join_stays_a_join(self):
+        previous = ('player_joined', {'username': 'ana', 'color': 'red', 'is_ready': False})
+        merged = merge_change(previous, 'player_updated', {'username': 'ana', 'is_ready': True})
+        self.assertEqual(merged, ('player_joined', {'username': 'ana', 'color': 'red', 'is_ready': True}))
+
+    def test_update_after_leave_is_ignored(self):
+        previous = ('player_left', {'username': 'ana'})
+        self.assertEqual(merge_change(previous, 'player_updated', {'username': 'ana', 'color': 'blue'}), previous)
+
+    def test_join_or_leave_replaces_what_was_waiting(self):
+        previous = ('player_updated', {'username': 'ana', 'color': 'red'})
+        self.assertEqual(
+            merge_change(previous, 'player_left', {'username': 'ana'}),
+            ('player_left', {'username': 'ana'}),
+        )
+        left = ('player_left', {'username': 'ana'})
+        self.assertEqual(
+            merge_change(left, 'player_joined', {'username': 'ana', 'color': 'green'}),
+            ('player_joined', {'username': 'ana', 'color': 'green'}),
+        )
+
+
+class TakeBatchesTests(SimpleTestCase):
+    def make(self, queued, **config):
+        matchmaker = Matchmaker(session_size=4, min_players=2, max_wait=10.0, **config)
+        matchmaker.queue = OrderedDict(queued)
+        return matchmaker
+
+    def test_full_batches_go_in_queue_order(self):
+        matchmaker = self.make([(f'p{i}', 0.0) for i in range(9)])
+        batches = matchmaker.take_batches(now=1.0)
+        self.assertEqual(batches, [['p0', 'p1', 'p2', 'p3'], ['p4', 'p5', 'p6', 'p7']])
+        self.assertEqual(list(matchmaker.queue), ['p8'])
+
+    def test_small_group_waits_for_max_wait(self):
+        matchmaker = self.make([('a', 0.0), ('b', 5.0), ('c', 6.0)])
+        self.assertEqual(matchmaker.take_batches(now=9.9), [])
+        self.assertEqual(len(matchmaker.queue), 3)
+        self.assertEqual(matchmaker.take_batches(now=10.0), [['a', 'b', 'c']])
+        self.assertEqual(len(matchmaker.queue), 0)
+
+    def test_lone_player_is_never_matched(self):
+        matchmaker = self.make([('a', 0.0)])
+        self.assertEqual(matchmaker.take_batches(now=100.0), [])
+        self.assertEqual(list(matchmaker.queue), ['a'])
+
+    def test_leftovers_after_full_batches_use_their_own_wait(self):
+        matchmaker = self.make([('a', 0.0), ('b', 0.0), ('c', 0.0), ('d', 0.0), ('e', 1.0), ('f', 8.0)])
+        self.assertEqual(matchmaker.take_batches(now=10.5), [['a', 'b', 'c', 'd']])
+        self.assertEqual(matchmaker.take_batches(now=11.0), [['e', 'f']])
@@ -0,0 +1,35 @@
+import time
+
+from django.core.cache import cache
+
+# Bumped on every write to LobbyStatus; cached lobby responses are keyed by it
+PLAYERS_VERSION_KEY = "lobby:players:version"
+
+
+def _start_version(key):
+    # A lost key restarts from the clock, so an old ETag can't match a new version
+    cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        _start_version(key)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        _start_version(key)
+        return cache.incr(key)
+
+
+def players_version():
+    return get_version(PLAYERS_VERSION_KEY)
+
+
+def bump_players_version():
+    return bump_version(PLAYERS_VERSION_KEY)
@@ -1,19 +1,84 @@
-from django.shortcuts import render
+import json
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
 
-# Create your views here.
-from django.http import JsonResponse
 from .models import LobbyStatus
+from .versions import players_version
 
-def get_lobby_players(request):
-    players = LobbyStatus.objects.all()
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def _flag(request, name):
+    value = request.GET.get(name)
+    if value is None:
+        return None
+    return BOOLEANS[value.lower()]
+
+
+def build_players_page(connected, is_ready, after, limit):
+    players = LobbyStatus.objects.select_related('user').only(
+        'id', 'color', 'is_ready', 'current_hole', 'score', 'user__username'
+    ).order_by('id')
+    if connected is not None:
+        players = players.filter(connected=connected)
+    if is_ready is not None:
+        players = players.filter(is_ready=is_ready)
+    if after is not None:
+        players = players.filter(id__gt=after)
+
+    page = list(players[:limit])
     data = [
         {
+            "id": player.id,
             "username": player.user.username,
             "color": player.color,
             "is_ready": player.is_ready,
             "hole": player.current_hole,
             "score": player.score
         }
-        for player in players
+        for player in page
     ]
-    return JsonResponse({"players": data})
+    # Keyset cursor: pass it back as ?after= for the next page
+    next_after = page[-1].id if len(page) == limit else None
+    return json.dumps({"players": data, "next": next_after})
+
+
+@require_GET
+def get_lobby_players(request):
+    """
+    GET /lobby/players/?connected=&is_ready=&after=&limit=
+
+    Pages are ordered by id. Responses are cached per lobby version and
+    carry an ETag, so polling while nothing changes gets a 304.
+    """
+    try:
+        connected = _flag(request, "connected")
+        is_ready = _flag(request, "is_ready")
+        after = int(request.GET["after"]) if "after" in request.GET else None
+        limit = min(int(request.GET.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE)
+    except (KeyError, ValueError):
+        return JsonResponse({"error": "Invalid query parameters"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "limit must be positive"}, status=400)
+
+    version = players_version()
+    etag = f'"lobby-{version}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        key = f"lobby:players:{version}:{connected}:{is_ready}:{after}:{limit}"
+        body = cache.get(key)
+        if body is None:
+            body = build_players_page(connected, is_ready, after, limit)
+            cache.set(key, body, timeout=300)
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = etag
+    # Always revalidate; an unchanged lobby costs a 304
+    patch_cache_control(response, no_cache=True)
+    return response
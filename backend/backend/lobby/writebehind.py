@@ -0,0 +1,71 @@
+import asyncio
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+from .versions import bump_players_version
+
+
+@database_sync_to_async
+def write_connected_flags(flags):
+    from .models import LobbyStatus
+    changed = 0
+    for connected in (True, False):
+        user_ids = [user_id for user_id, flag in flags.items() if flag is connected]
+        if user_ids:
+            changed += LobbyStatus.objects.filter(user_id__in=user_ids).exclude(connected=connected).update(connected=connected)
+    if changed:
+        bump_players_version()
+
+
+class ConnectedFlagQueue:
+    """
+    Write-behind buffer for ``LobbyStatus.connected``.
+
+    Connects and disconnects only record the latest flag per user; a
+    background task writes everything pending as at most two bulk
+    ``UPDATE``s every ``interval`` seconds. A player who reconnects
+    within one interval costs no write at all. The database can lag
+    the live lobby by up to one interval, which only matters to code
+    that reads the flag straight from the table.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.pending = {}
+        self._task = None
+
+        # Counters
+        self.queued = 0
+        self.written = 0
+        self.flushes = 0
+
+    def mark(self, user_id, connected):
+        self.pending[user_id] = connected
+        self.queued += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        flags, self.pending = self.pending, {}
+        if not flags:
+            return
+        try:
+            await write_connected_flags(flags)
+        except Exception as e:
+            # Keep anything that changed since for the next round
+            print(f"[Lobby] Failed to write connected flags: {e}")
+            self.pending = {**flags, **self.pending}
+            return
+        self.written += len(flags)
+        self.flushes += 1
+
+
+connected_flags = ConnectedFlagQueue(
+    getattr(settings, "LOBBY_CONNECTED_FLUSH_INTERVAL", 1.0)
+)
@@ -89,6 +89,98 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache (lobby/leaderboard response caches and their version stamps)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://redis:6379/1",
+    }
+}
+
+# Game presence (who is on which hole) - shared across workers via Redis.
+# Use backend.game.presence.InMemoryPresenceRegistry for a single process or tests.
+GAME_PRESENCE = {
+    "BACKEND": "backend.game.presence.RedisPresenceRegistry",
+    "CONFIG": {
+        "host": "redis",
+        "port": 6379,
+    },
+}
+
+# Game server tick rate (Hz) - moves are batched into one snapshot per tick
+GAME_TICK_RATE = int(os.environ.get('GAME_TICK_RATE', 20))
+
+# Interest management: players get full-rate moves only from grid cells
+# within RADIUS cells of their ball, plus a summary every SUMMARY_EVERY ticks
+# and a full keyframe every KEYFRAME_EVERY ticks
+GAME_INTEREST = {
+    "CELL_SIZE": 200,
+    "RADIUS": 1,
+    "SUMMARY_EVERY": 20,
+    "KEYFRAME_EVERY": 100,
+}
+
+# Positions are snapped to this grid (px) and only sent when they change
+GAME_POSITION_QUANTUM = 0.5
+
+# Most frames that may wait in one game connection's send queue before it's
+# considered too slow and closed (queued moves are merged and don't count)
+GAME_OUTBOX_MAX_FRAMES = 512
+
+# Level files used by the server-side putt simulator
+GAME_LEVELS_DIR = os.path.join(BASE_DIR, 'frontend/public/levels')
+
+# Most putts simulated per tick; the rest wait for the next tick. A putt
+# costs about 1.4 ms to simulate and batching doesn't make it cheaper, so
+# 16 keeps the simulation well inside a 50 ms tick
+GAME_MAX_PUTTS_PER_TICK = 16
+
+# Most players whose putt may wait for the simulator at once on one hole
+# (each player has at most one putt waiting); further putts are dropped
+GAME_MAX_QUEUED_PUTTS = 256
+
+# Lobby changes are merged into one broadcast once WINDOW seconds pass
+# without a new change, or MAX_DELAY seconds after the first one
+LOBBY_BROADCAST = {
+    "WINDOW": 0.05,
+    "MAX_DELAY": 0.25,
+}
+
+# Lobby rooms hold ROOM_CAPACITY players. Ready players are queued and sent
+# into a game session SESSION_SIZE at a time, or as soon as MIN_PLAYERS have
+# waited MAX_WAIT seconds (checked every INTERVAL seconds)
+LOBBY_MATCHMAKING = {
+    "ROOM_CAPACITY": 8,
+    "SESSION_SIZE": 4,
+    "MIN_PLAYERS": 2,
+    "MAX_WAIT": 10.0,
+    "INTERVAL": 1.0,
+}
+
+# Lobby presence: consumers refresh a TTL every HEARTBEAT seconds and a
+# reaper expires lapsed players every REAP_EVERY seconds. Shared via Redis;
+# use backend.lobby.presence.InMemoryLobbyPresence for a single process or tests.
+LOBBY_PRESENCE = {
+    "BACKEND": "backend.lobby.presence.RedisLobbyPresence",
+    "CONFIG": {
+        "host": "redis",
+        "port": 6379,
+    },
+    "TTL": 30,
+    "HEARTBEAT": 10,
+    "REAP_EVERY": 10,
+}
+
+# Lobby connected/disconnected flags are written to the DB in bulk this often (s)
+LOBBY_CONNECTED_FLUSH_INTERVAL = 1.0
+
+# auth_token cookie -> user lookups are cached per process for TTL seconds;
+# a logout handled by another worker takes effect here once the entry expires
+AUTH_TOKEN_CACHE = {
+    "MAX_SIZE": 10000,
+    "TTL": 60,
+}
+
 
 
 # Database
@@ -187,3 +279,15 @@ LOGGING = {
  },
 }
 
+
+# Leaderboard reads come from an in-memory index seeded once per process;
+# TOP_N caps the board pushed over the websocket, AROUND_WINDOW the places
+# either side of a player returned by the around queries. Score changes
+# within PUBLISH_WINDOW seconds share one broadcast. The HTTP snapshot may be
+# served from browser/proxy caches for SNAPSHOT_MAX_AGE seconds.
+LEADERBOARD = {
+    "TOP_N": 100,
+    "AROUND_WINDOW": 5,
+    "PUBLISH_WINDOW": 0.25,
+    "SNAPSHOT_MAX_AGE": 5,
+}
@@ -20,7 +20,7 @@ from django.urls import path, include
 from django.views.generic import TemplateView
 
 
-from backend.core.views import LoginView, RegisterView, CheckCookie, Logout, Leaderboard, Avatar, player_stats, AchievementsView, Avatar_ball
+from backend.core.views import LoginView, RegisterView, CheckCookie, Logout, Leaderboard, LeaderboardBatch, Avatar, player_stats, AchievementsView, Avatar_ball
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -30,6 +30,9 @@ urlpatterns = [
     path("api/check_cookie", CheckCookie.as_view()),
     path("api/logout", Logout.as_view()),
     path("api/leaderboard", Leaderboard.as_view()),
+    path("api/leaderboard/batch", LeaderboardBatch.as_view()),
+    path("api/leaderboard/", include("backend.leaderboard.urls")),
+    path("api/holes/", include("backend.game.urls")),
     path("lobby/", include("backend.lobby.urls")),
     path('achievements/', AchievementsView.as_view()),
     path('api/achievements/', AchievementsView.as_view()),
@@ -14,7 +14,7 @@ const Achievements = () => {
         const u = auth.username || '';
         setUsername(u);
 
-        return fetch('/api/achievements/')
+        return fetch(`/api/achievements/?username=${encodeURIComponent(u)}`)
           .then(res => res.json())
           .then(data => {
             console.log('Fetched achievement data:', data);
@@ -1,8 +1,23 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom'; // Add this!
 
+const TOP_N = 100;
+const AROUND = 5;
+
+// Apply one window's patch: drop players who left, then insert/replace by player
+const applyWindowPatch = (entries, patch) => {
+  if (!patch) return entries;
+  const removed = new Set(patch.remove);
+  const upserted = new Map(patch.upsert.map((entry) => [entry.player, entry]));
+  const kept = entries.filter((entry) => !removed.has(entry.player) && !upserted.has(entry.player));
+  return [...kept, ...upserted.values()].sort((a, b) => a.rank - b.rank);
+};
+
 const Leaderboard = () => {
   const [scores, setScores] = useState([]);
+  const [around, setAround] = useState([]);
+  const [myRank, setMyRank] = useState(null);
+  const [total, setTotal] = useState(0);
   const [socket, setSocket] = useState(null);
   const navigate = useNavigate(); // And this!
 
@@ -12,13 +27,22 @@ const Leaderboard = () => {
 
     ws.onopen = () => {
       console.log('Leaderboard WebSocket connected');
-      ws.send(JSON.stringify({ type: 'request_leaderboard' }));
+      // Top of the board plus the places around us; updates arrive as patches
+      ws.send(JSON.stringify({ type: 'subscribe', top: TOP_N, around: AROUND }));
     };
 
     ws.onmessage = (e) => {
       const data = JSON.parse(e.data);
-      if (data.type === 'leaderboard') {
-        setScores(data.leaders); // [{ player, score }]
+      if (data.type === 'leaderboard_snapshot') {
+        setScores(data.top || []); // [{ rank, player, score }]
+        setAround(data.around || []);
+        setMyRank(data.rank);
+        setTotal(data.total);
+      } else if (data.type === 'leaderboard_patch') {
+        setScores((prev) => applyWindowPatch(prev, data.top));
+        setAround((prev) => applyWindowPatch(prev, data.around));
+        setMyRank(data.rank);
+        setTotal(data.total);
       }
     };
 
@@ -29,7 +53,8 @@ const Leaderboard = () => {
     return () => ws.close();
   }, []);
 
-  const sortedScores = scores.sort((a, b) => a.score - b.score);
+  // Only show the around-me rows that aren't already in the top table
+  const aroundBelowTop = around.filter((entry) => entry.rank > scores.length);
 
   const handleBackClick = () => {
     navigate('/lobby');
@@ -63,14 +88,26 @@ const Leaderboard = () => {
             </tr>
           </thead>
           <tbody>
-            {sortedScores.map((player, idx) => (
-              <tr key={idx} className="text-lg text-gray-700 hover:bg-green-100 transition">
-                <td className="py-3">{idx + 1}</td>
+            {scores.map((player) => (
+              <tr key={player.player} className="text-lg text-gray-700 hover:bg-green-100 transition">
+                <td className="py-3">{player.rank}</td>
+                <td className="py-3">{player.player}</td>
+                <td className="py-3 text-right font-semibold">{player.score}</td>
+              </tr>
+            ))}
+            {aroundBelowTop.length > 0 && (
+              <tr>
+                <td colSpan="3" className="text-center py-2 text-gray-400">⋯</td>
+              </tr>
+            )}
+            {aroundBelowTop.map((player) => (
+              <tr key={player.player} className="text-lg text-gray-700 hover:bg-green-100 transition">
+                <td className="py-3">{player.rank}</td>
                 <td className="py-3">{player.player}</td>
                 <td className="py-3 text-right font-semibold">{player.score}</td>
               </tr>
             ))}
-            {sortedScores.length === 0 && (
+            {scores.length === 0 && (
               <tr>
                 <td colSpan="3" className="text-center py-8 text-gray-500">
                   Waiting for leaderboard data...
@@ -79,6 +116,11 @@ const Leaderboard = () => {
             )}
           </tbody>
         </table>
+        {myRank && (
+          <p className="mt-6 text-center text-lg text-green-800 font-semibold">
+            Your rank: #{myRank} of {total}
+          </p>
+        )}
       </div>
     </div>
   );
@@ -1,6 +1,8 @@
 import React, { useEffect, useRef, useState } from 'react';
 import Phaser from 'phaser';
-import { useParams, useNavigate } from 'react-router-dom';
+import { useParams, useNavigate, useSearchParams } from 'react-router-dom';
+import { BINARY_SUBPROTOCOL, decodeFrame, encodeMove, encodePutt } from './protocol';
+import { currentRound, endRound } from './round';
 
 const HoleSceneFactory = (levelData) => {
   return class HoleScene extends Phaser.Scene {
@@ -71,7 +73,9 @@ const HoleSceneFactory = (levelData) => {
         this.ball.setVelocity(Math.cos(angle) * power, Math.sin(angle) * power);
 
         if (this.socket && this.socket.readyState === WebSocket.OPEN) {
-          this.socket.send(JSON.stringify({ type: 'putt', angle, power }));
+          this.socket.send(this.socket.protocol === BINARY_SUBPROTOCOL
+            ? encodePutt(angle, power, this.ball.x, this.ball.y)
+            : JSON.stringify({ type: 'putt', angle, power, x: this.ball.x, y: this.ball.y }));
         }
       });
 
@@ -308,7 +312,9 @@ const HoleSceneFactory = (levelData) => {
     update(time) {
       this.input.enabled = this.ball.body.speed < 1 && this.shotCount < 8;
       if (this.socket && this.ball.body.speed > 1 && (!this.lastSent || time - this.lastSent > 100)) {
-        this.socket.send(JSON.stringify({ type: 'move', x: this.ball.x, y: this.ball.y }));
+        this.socket.send(this.socket.protocol === BINARY_SUBPROTOCOL
+          ? encodeMove(this.ball.x, this.ball.y)
+          : JSON.stringify({ type: 'move', x: this.ball.x, y: this.ball.y }));
         this.lastSent = time;
       }
     }
@@ -318,10 +324,16 @@ const HoleSceneFactory = (levelData) => {
 export default function GameCanvas() {
   const { holeId } = useParams();
   const navigate = useNavigate();
+  // Set when the lobby matched us into a game session
+  const [searchParams] = useSearchParams();
+  const session = searchParams.get('session');
+  const sessionQuery = session ? `?session=${session}` : '';
   const [isComplete, setIsComplete] = useState(false);
   const [shotLimitReached, setShotLimitReached] = useState(false);
   const [totalShots, setTotalShots] = useState(0);
   const [username, setUsername] = useState(null);
+  // One id per game, shared by reloads, reconnects and other tabs; the lobby starts a new one
+  const [roundId] = useState(currentRound);
 
   const gameRef = useRef(null);
   const sceneRef = useRef(null);
@@ -353,27 +365,33 @@ export default function GameCanvas() {
     setIsComplete(false);
     setShotLimitReached(false);
 
-    const socket = new WebSocket(`ws://localhost:8080/ws/game/hole/${holeId}/`);
+    const socket = new WebSocket(`ws://localhost:8080/ws/game/hole/${holeId}/${sessionQuery}`, [BINARY_SUBPROTOCOL]);
+    socket.binaryType = 'arraybuffer';
+    const playerNames = new Map(); // player id -> username, for binary frames
+    let quantum = 1;
     socket.onmessage = (e) => {
-      const data = JSON.parse(e.data);
+      const data = typeof e.data === 'string' ? JSON.parse(e.data) : decodeFrame(e.data, playerNames, quantum);
+      if (!data) return;
       if (data.type === 'connection_success') {
+        quantum = data.quantum;
+        playerNames.set(data.player_id, data.username);
         setUsername(data.username);
       }
-      if (data.type === 'player_moved' && sceneRef.current) {
-        if (data.username !== username){
-            sceneRef.current.addOrUpdateGhost(
-            data.username,
-            data.x,
-            data.y,
-        );
-        }
-        else {
-          sceneRef.current.showLabelOnly(
-            data.username,
-            data.x,
-            data.y
-        );
-        }
+      if (data.type === 'players_present') {
+        data.players.forEach((p) => playerNames.set(p.player_id, p.username));
+      }
+      if (data.type === 'player_joined') {
+        playerNames.set(data.player_id, data.username);
+      }
+      // Snapshots cover nearby balls at full rate, summaries cover the whole hole
+      if ((data.type === 'positions_snapshot' || data.type === 'positions_summary') && sceneRef.current) {
+        data.positions.forEach((p) => {
+          if (p.username !== username) {
+            sceneRef.current.addOrUpdateGhost(p.username, p.x, p.y);
+          } else {
+            sceneRef.current.showLabelOnly(p.username, p.x, p.y);
+          }
+        });
       }
       if (data.type === 'player_left') {
         if (sceneRef.current?.removeGhost) {
@@ -406,14 +424,23 @@ export default function GameCanvas() {
           sceneRef.current = sceneInstance;
         });
 
+        // Per-hole strokes feed the hole statistics; the server keeps the first report per round
+        const reportHole = (scene) => {
+          if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'hole_result', strokes: scene.shotCount, round: roundId }));
+          }
+        };
+
         game.events.on('holeComplete', () => {
           setIsComplete(true);
           unlockAchievement('first_putt');
+          if (sceneRef.current) reportHole(sceneRef.current);
         });
 
         game.events.on('shotLimitReached', () => {
           setShotLimitReached(true);
           unlockAchievement('shot_limit');
+          if (sceneRef.current) reportHole(sceneRef.current);
         });
 
         game.events.on('playerShot', () => setTotalShots((prev) => prev + 1));
@@ -427,7 +454,7 @@ export default function GameCanvas() {
       }
       socket.close();
     };
-  }, [holeId, username]);
+  }, [holeId, username, sessionQuery, roundId]);
 
   const currentHole = Number(holeId);
   const isLastHole = currentHole >= 6;
@@ -436,6 +463,7 @@ export default function GameCanvas() {
   const handleButtonClick = () => {
     if (isLastHole) {
       unlockAchievement('finished_all_holes');
+      endRound();
       fetch('/api/leaderboard', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
@@ -445,7 +473,7 @@ export default function GameCanvas() {
         .then(() => navigate('/leaderboard'))
         .catch(console.error);
     } else {
-      navigate(`/hole/${currentHole + 1}`);
+      navigate(`/hole/${currentHole + 1}${sessionQuery}`);
     }
   };
 
@@ -0,0 +1,75 @@
+// Binary game protocol - mirrors backend/game/protocol.py
+export const BINARY_SUBPROTOCOL = 'golf.bin.v1';
+
+const OP_POSITIONS = 0x01;
+const OP_PUTT = 0x02;
+const OP_LEFT = 0x03;
+const OP_SUMMARY = 0x04;
+const OP_MOVE = 0x11;
+const OP_PUTT_REQUEST = 0x12;
+
+export function encodeMove(x, y) {
+  const view = new DataView(new ArrayBuffer(9));
+  view.setUint8(0, OP_MOVE);
+  view.setFloat32(1, x, true);
+  view.setFloat32(5, y, true);
+  return view.buffer;
+}
+
+export function encodePutt(angle, power, x, y) {
+  const view = new DataView(new ArrayBuffer(17));
+  view.setUint8(0, OP_PUTT_REQUEST);
+  view.setFloat32(1, angle, true);
+  view.setFloat32(5, power, true);
+  view.setFloat32(9, x, true);
+  view.setFloat32(13, y, true);
+  return view.buffer;
+}
+
+// Turns a binary frame into the same shape as the JSON messages.
+// `names` maps player ids to usernames; positions are sent as int16
+// multiples of `quantum` (from connection_success).
+export function decodeFrame(buffer, names, quantum) {
+  const view = new DataView(buffer);
+  const op = view.getUint8(0);
+
+  if (op === OP_POSITIONS || op === OP_SUMMARY) {
+    const count = view.getUint16(1, true);
+    const positions = [];
+    for (let i = 0, at = 3; i < count; i++, at += 6) {
+      positions.push({
+        username: names.get(view.getUint16(at, true)),
+        x: view.getInt16(at + 2, true) * quantum,
+        y: view.getInt16(at + 4, true) * quantum,
+      });
+    }
+    return { type: op === OP_SUMMARY ? 'positions_summary' : 'positions_snapshot', positions };
+  }
+
+  if (op === OP_PUTT) {
+    const count = view.getUint16(20, true);
+    const keyframes = [];
+    for (let i = 0, at = 22; i < count; i++, at += 12) {
+      keyframes.push([
+        view.getFloat32(at, true),
+        view.getFloat32(at + 4, true),
+        view.getFloat32(at + 8, true),
+      ]);
+    }
+    return {
+      type: 'player_putt',
+      username: names.get(view.getUint16(1, true)),
+      angle: view.getFloat32(3, true),
+      power: view.getFloat32(7, true),
+      sunk: view.getUint8(11) === 1,
+      final: { x: view.getFloat32(12, true), y: view.getFloat32(16, true) },
+      keyframes,
+    };
+  }
+
+  if (op === OP_LEFT) {
+    return { type: 'player_left', username: names.get(view.getUint16(1, true)) };
+  }
+
+  return null;
+}
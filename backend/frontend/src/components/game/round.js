@@ -0,0 +1,20 @@
+// Round id for hole results - the server keeps one result per hole per round.
+// Kept in localStorage so reloads, reconnects and other tabs share it.
+const ROUND_KEY = 'roundId';
+
+// Call when a new game begins (from the lobby)
+export function startRound() {
+  const roundId = crypto.randomUUID();
+  localStorage.setItem(ROUND_KEY, roundId);
+  return roundId;
+}
+
+// The round in progress, or a new one if the game was opened directly
+export function currentRound() {
+  return localStorage.getItem(ROUND_KEY) || startRound();
+}
+
+// Call once the last hole is done so the next game gets a fresh round
+export function endRound() {
+  localStorage.removeItem(ROUND_KEY);
+}
@@ -2,14 +2,30 @@ import React, { useEffect, useState } from 'react';
 import { useNavigate, Routes, Route } from 'react-router-dom';
 import Leaderboard from '../Leaderboard/Leaderboard';
 import Stats from '../Stats/Stats';
+import { startRound } from '../game/round';
 
 
+const applyLobbyChange = (players, change) => {
+  const { username } = change.player;
+  if (change.type === 'player_joined') {
+    return [...players.filter(p => p.username !== username), change.player];
+  }
+  if (change.type === 'player_updated') {
+    return players.map(p => (p.username === username ? { ...p, ...change.player } : p));
+  }
+  if (change.type === 'player_left') {
+    return players.filter(p => p.username !== username);
+  }
+  return players;
+};
+
 const GolfLobbyMenu = () => {
   const [players, setPlayers] = useState([]);
   const [socket, setSocket] = useState(null);
   const [welcomeMessage, setWelcomeMessage] = useState('');
   const [userName, setUserName] = useState('');
   const [selectedColor, setSelectedColor] = useState('');
+  const [room, setRoom] = useState(null);
   const navigate = useNavigate();
   const [showSettings, setShowSettings] = useState(false);  // Added state for settings modal
   const [profileImage, setProfileImage] = useState(null);  // To store the selected image
@@ -32,6 +48,19 @@ const GolfLobbyMenu = () => {
       if (data.type === 'players_list') {
         setPlayers(data.players);
       }
+      // Batched deltas: only the players that changed are sent
+      if (data.type === 'lobby_update') {
+        setPlayers(prev => data.changes.reduce(applyLobbyChange, prev));
+      }
+      if (data.type === 'room') {
+        setRoom(data);
+      }
+      // Matchmaking found a group: everyone in it starts the same session
+      if (data.type === 'game_session') {
+        ws.close();
+        startRound();
+        navigate(`/hole/${data.hole}?session=${data.session}`);
+      }
       if (data.type === 'username') {
         setWelcomeMessage(`Welcome, ${data.username}!`);
         setUsername(data.username);
@@ -116,10 +145,17 @@ const GolfLobbyMenu = () => {
     setSelectedColor(newColor);
     socket?.send(JSON.stringify({ type: 'set_color', color: newColor }));
   };
+  const isReady = players.some(p => p.username === username && p.is_ready);
+
+  const handleToggleReady = () => {
+    socket?.send(JSON.stringify({ type: 'toggle_ready' }));
+  };
+
   const handleJoinGame = () => {
   if (socket) {
     socket.close(); // Close the WebSocket connection
   }
+  startRound(); // New game, new round for hole results
   navigate('/hole/1'); // Navigate to the Phaser game
   };
 
@@ -201,16 +237,19 @@ const GolfLobbyMenu = () => {
 
       {/* Player List */}
       <div className="z-10 w-1/3 max-w-xs bg-white bg-opacity-90 rounded-xl shadow-lg p-6 overflow-y-auto">
-        <h2 className="text-2xl font-semibold text-green-800 mb-4">Players Waiting</h2>
+        <h2 className="text-2xl font-semibold text-green-800 mb-4">
+          Players Waiting{room ? ` · Room ${room.room} (${players.length}/${room.capacity})` : ''}
+        </h2>
         {players.length > 0 ? (
           <ul className="space-y-2">
-            {players.map((player, idx) => (
-              <li key={idx} className="text-lg text-gray-700 break-words flex items-center gap-2">
+            {players.map((player) => (
+              <li key={player.username} className="text-lg text-gray-700 break-words flex items-center gap-2">
                 <div
                   className="w-4 h-4 rounded-full border border-black"
                   style={{ backgroundColor: player.color || 'gray' }}
                 ></div>
                 <span>{player.username}</span>
+                {player.is_ready && <span className="text-green-700">✅</span>}
               </li>
             ))}
           </ul>
@@ -254,6 +293,12 @@ const GolfLobbyMenu = () => {
             className="w-72 text-2xl px-6 py-4 bg-gradient-to-r from-lime-500 to-emerald-600 text-white rounded-xl shadow-lg hover:scale-105 transform transition duration-300 border-2 border-emerald-800"
           >
             ⛳ Join Game
+          </button>
+          <button
+            onClick={handleToggleReady}
+            className="w-72 text-2xl px-6 py-4 bg-gradient-to-r from-teal-400 to-cyan-600 text-white rounded-xl shadow-lg hover:scale-105 transform transition duration-300 border-2 border-cyan-800"
+          >
+            {isReady ? '⏳ Finding players… (cancel)' : '🎯 Find Match'}
           </button>
             <button
           onClick={() => {